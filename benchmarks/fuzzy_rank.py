@@ -0,0 +1,82 @@
+"""Time fuzzy path ranking over a large synthetic arena.
+
+Generates paths shaped like a home directory full of projects, packs
+them into a PathArena, and times a set of queries twice: against the
+whole arena, and refined — each query ranked from the matches of the
+one before it, as typing does, where that query narrows it.
+
+    python benchmarks/fuzzy_rank.py --paths 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shellguide.core.fuzzy import PathArena, _narrows  # noqa: E402
+
+WORDS = (
+    "alpha beta gamma delta report config main test util index draft photo "
+    "invoice notes build module data backup src docs lib scripts assets"
+).split()
+EXTENSIONS = (".py", ".txt", ".md", ".json", ".png", ".csv", ".toml", "")
+
+QUERIES = ["co", "con", "conf", "confpy", "srcmain", "inv42", "zzqx"]
+
+
+def make_paths(count: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    paths = []
+    while len(paths) < count:
+        project = f"{rng.choice(WORDS)}-{rng.randrange(1000)}"
+        for _ in range(rng.randrange(50, 500)):
+            depth = rng.randrange(1, 4)
+            parts = [project] + [rng.choice(WORDS) for _ in range(depth)]
+            name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}{rng.randrange(100)}"
+            paths.append("/".join(parts) + "/" + name + rng.choice(EXTENSIONS))
+    return paths[:count]
+
+
+def timed(func, repeat: int) -> tuple[float, object]:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = make_paths(args.paths)
+    start = time.perf_counter()
+    arena = PathArena(paths)
+    print(f"{len(arena)} paths packed in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    del paths
+
+    print(f"  {'query':<10} {'matches':>9} {'full':>9} {'refined':>9}   best")
+    previous, previous_query = arena, ""
+    for query in QUERIES:
+        full, (ranked, matched) = timed(lambda: arena.search(query, args.limit), args.repeat)
+        refined = "-"
+        if _narrows(previous_query, query):
+            seconds, _ = timed(lambda: previous.search(query, args.limit), args.repeat)
+            refined = f"{seconds * 1000:.0f}ms"
+        best = ranked[0][1] if ranked else "-"
+        print(f"  {query:<10} {len(matched):>9} {full * 1000:>7.0f}ms {refined:>9}   {best}")
+        previous, previous_query = matched, query
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare the ways ShellGuide can collect metadata for a large directory.
+
+Builds synthetic directories of empty files (plus a few subdirectories)
+and times each backend over them:
+
+  scandir+stat  scan_directory: one stat per os.scandir entry
+  threads       scan_directory_parallel: names first, stat on a thread pool
+  io_uring      scan_directory_batched: names first, statx in ring batches
+
+and, to separate system call overhead from Python overhead, the bare
+loops underneath them (os.stat per name against one statx_batch pass).
+
+    python benchmarks/stat_backends.py --sizes 10000 50000 200000
+
+With --cold the page cache is dropped before every run, which needs
+root on Linux.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shellguide.core import uring  # noqa: E402
+from shellguide.core.listing import (  # noqa: E402
+    _scan_directory_serial,
+    scan_directory_batched,
+    scan_directory_parallel,
+)
+
+
+def make_directory(root: Path, entries: int) -> Path:
+    path = root / f"d{entries}"
+    if path.is_dir() and len(os.listdir(path)) == entries:
+        return path
+    path.mkdir(exist_ok=True)
+    for i in range(entries):
+        if i % 100 == 0:
+            (path / f"dir{i:07d}").mkdir(exist_ok=True)
+        else:
+            (path / f"file{i:07d}.txt").touch()
+    return path
+
+
+def drop_caches() -> None:
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("2\n")
+
+
+def stat_loop(path: Path) -> None:
+    base = os.fsencode(path) + b"/"
+    for name in os.listdir(os.fsencode(path)):
+        try:
+            os.stat(base + name)
+        except OSError:
+            pass
+
+
+def statx_batch_loop(path: Path) -> None:
+    for _ in uring.statx_batch(path, os.listdir(os.fsencode(path))):
+        pass
+
+
+def run(label: str, func, path: Path, repeat: int, cold: bool) -> None:
+    times = []
+    for _ in range(repeat):
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        func(path)
+        times.append(time.perf_counter() - start)
+    best, median = min(times), statistics.median(times)
+    print(f"  {label:<16} best {best * 1000:9.1f} ms   median {median * 1000:9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="drop the page cache before each run")
+    parser.add_argument("--root", type=Path, help="where to build the directories (kept)")
+    args = parser.parse_args()
+
+    if not uring.available():
+        print("io_uring is not available here; its rows fall back to scandir+stat.\n")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        root = args.root or Path(scratch)
+        root.mkdir(parents=True, exist_ok=True)
+        for size in args.sizes:
+            path = make_directory(root, size)
+            print(f"{size} entries{' (cold cache)' if args.cold else ''}")
+            run("scandir+stat", lambda p: _scan_directory_serial(p, lambda: False), path,
+                args.repeat, args.cold)
+            run("threads", scan_directory_parallel, path, args.repeat, args.cold)
+            run("io_uring", scan_directory_batched, path, args.repeat, args.cold)
+            if uring.available():
+                run("bare os.stat", stat_loop, path, args.repeat, args.cold)
+                run("bare statx_batch", statx_batch_loop, path, args.repeat, args.cold)
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -29,8 +29,17 @@ def _quote(path: Path) -> str:
     return s
 
 
-def build_ls(path: Path, show_hidden: bool = False) -> ShellCommand:
-    flags = "-la" if show_hidden else "-l"
+_LS_SORT_EXPLANATIONS = {
+    "S": " -S sorts by size, largest first.",
+    "t": " -t sorts by modification time, newest first.",
+    "X": " -X sorts by extension (GNU ls).",
+    "v": " -v sorts numbers in names naturally, so file2 comes before file10 (GNU ls).",
+    "r": " -r reverses the order.",
+}
+
+
+def build_ls(path: Path, show_hidden: bool = False, sort_flags: str = "") -> ShellCommand:
+    flags = ("-la" if show_hidden else "-l") + sort_flags
     return ShellCommand(
         command=f"ls {flags} {_quote(path)}",
         explanation=(
@@ -39,6 +48,7 @@ def build_ls(path: Path, show_hidden: bool = False) -> ShellCommand:
             + ". Long format (-l) shows file sizes and dates — helpful for knowing "
             "when things last changed."
             + (" -a reveals hidden dotfiles like .gitignore and .env." if show_hidden else "")
+            + "".join(_LS_SORT_EXPLANATIONS.get(flag, "") for flag in sort_flags)
         ),
         danger_level=DangerLevel.SAFE,
         gui_equivalent="Opening a Finder window to see folder contents",
@@ -195,6 +205,20 @@ def build_find(root: Path, name: str) -> ShellCommand:
     )
 
 
+def build_ls_grep(path: Path, pattern: str, show_hidden: bool = False) -> ShellCommand:
+    flags = " -a" if show_hidden else ""
+    return ShellCommand(
+        command=f"ls{flags} {_quote(path)} | grep -iF '{pattern}'",
+        explanation=(
+            f"List '{path.name or '/'}' and keep only names containing '{pattern}'. "
+            "The pipe (|) feeds ls's output into grep; -i ignores case and -F "
+            "matches the text literally. Unlike find, this only looks in one folder."
+        ),
+        danger_level=DangerLevel.SAFE,
+        gui_equivalent="Typing in the Finder search box, limited to the current folder",
+    )
+
+
 def build_stat(path: Path) -> ShellCommand:
     return ShellCommand(
         command=f"stat {_quote(path)}",
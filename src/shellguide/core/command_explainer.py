@@ -13,6 +13,8 @@ COMMAND_REFERENCE: dict[str, dict[str, str]] = {
             "-t": "Sort by modification time (newest first). Helpful when you want to find the most recently changed files.",
             "-S": "Sort by file size (largest first). Useful for finding what's taking up disk space.",
             "-r": "Reverse the sort order. Combine with -t to see oldest files first, or with -S to see smallest first.",
+            "-X": "Sort by extension (GNU ls). Groups all the .py files together, then all the .txt files, and so on.",
+            "-v": "Natural (version) sort (GNU ls) — numbers inside names are compared as numbers, so file2 comes before file10.",
         },
     },
     "cd": {
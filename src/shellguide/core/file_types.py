@@ -0,0 +1,195 @@
+"""File type detection from names and leading bytes."""
+
+from __future__ import annotations
+
+import re
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# How many leading bytes are read to recognise a file. Enough for every
+# signature below, including the tar header's "ustar" at offset 257.
+SNIFF_BYTES = 512
+
+# How many sniffed files are remembered.
+CACHE_ENTRIES = 4096
+
+Identity = tuple[int, int, int, float]
+"""Device, inode, size and mtime: a file's contents are unchanged while these are."""
+
+_EXTENSION_TYPES = {
+    "py": "Python", "js": "JavaScript", "ts": "TypeScript",
+    "html": "HTML", "css": "CSS", "json": "JSON", "yaml": "YAML",
+    "yml": "YAML", "md": "Markdown", "txt": "Text", "sh": "Shell",
+    "bash": "Bash", "zsh": "Zsh", "toml": "TOML", "cfg": "Config",
+    "ini": "Config", "xml": "XML", "csv": "CSV", "sql": "SQL",
+    "rs": "Rust", "go": "Go", "java": "Java", "c": "C",
+    "cpp": "C++", "h": "C Header", "rb": "Ruby", "php": "PHP",
+    "swift": "Swift", "kt": "Kotlin", "r": "R",
+    "png": "PNG Image", "jpg": "JPEG Image", "jpeg": "JPEG Image",
+    "gif": "GIF Image", "svg": "SVG Image", "ico": "Icon",
+    "pdf": "PDF", "zip": "ZIP Archive", "tar": "Tar Archive",
+    "gz": "GZip Archive", "mp3": "MP3 Audio", "mp4": "MP4 Video",
+}
+
+# (offset, signature, type) — checked in order, first match wins.
+_MAGIC = (
+    (0, b"\x89PNG\r\n\x1a\n", "PNG Image"),
+    (0, b"\xff\xd8\xff", "JPEG Image"),
+    (0, b"GIF87a", "GIF Image"),
+    (0, b"GIF89a", "GIF Image"),
+    (0, b"%PDF-", "PDF"),
+    (0, b"PK\x03\x04", "ZIP Archive"),
+    (0, b"\x1f\x8b", "GZip Archive"),
+    (0, b"BZh", "BZip2 Archive"),
+    (0, b"\xfd7zXZ\x00", "XZ Archive"),
+    (0, b"(\xb5/\xfd", "Zstandard Archive"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7-Zip Archive"),
+    (257, b"ustar", "Tar Archive"),
+    (0, b"\x7fELF", "ELF Executable"),
+    (0, b"\xcf\xfa\xed\xfe", "Mach-O Executable"),
+    (0, b"\xce\xfa\xed\xfe", "Mach-O Executable"),
+    (0, b"\xca\xfe\xba\xbe", "Mach-O Universal Binary"),
+    (0, b"SQLite format 3\x00", "SQLite Database"),
+    (0, b"ID3", "MP3 Audio"),
+    (0, b"OggS", "Ogg Audio"),
+    (0, b"fLaC", "FLAC Audio"),
+    (0, b"\x00asm", "WebAssembly"),
+)
+
+_RIFF_TYPES = {b"WAVE": "WAV Audio", b"WEBP": "WebP Image", b"AVI ": "AVI Video"}
+
+# ISO base media files ("ftyp" at offset 4) by major brand. Other brands
+# are reported as the generic container.
+_FTYP_BRANDS = {
+    b"heic": "HEIC Image", b"heix": "HEIC Image", b"mif1": "HEIF Image",
+    b"avif": "AVIF Image", b"M4A ": "M4A Audio", b"M4B ": "M4B Audiobook",
+    b"M4V ": "M4V Video", b"qt  ": "QuickTime Video", b"3gp4": "3GP Video",
+    b"3gp5": "3GP Video", b"crx ": "Canon Raw Image",
+}
+
+# Signatures shared by formats built on them: .docx, .jar and .epub are
+# ZIP files, most ISO base media brands are "MP4". Such a file keeps the
+# name its extension gives it.
+_CONTAINERS = frozenset({"ZIP Archive", "MP4 Video"})
+
+# Image bits per pixel an icon directory entry may give.
+_ICON_DEPTHS = frozenset({0, 1, 4, 8, 16, 24, 32})
+
+_INTERPRETERS = {
+    "python": "Python", "bash": "Bash", "sh": "Shell", "dash": "Shell",
+    "zsh": "Zsh", "fish": "Fish", "node": "JavaScript", "deno": "TypeScript",
+    "ruby": "Ruby", "perl": "Perl", "php": "PHP", "lua": "Lua", "awk": "Awk",
+}
+
+_SHEBANG = re.compile(rb"#!\s*(\S+)(?:[ \t]+(\S+))?")
+_VERSION_SUFFIX = re.compile(r"[\d.]+$")
+
+# Bytes that turn up in text files. Anything else (NUL in particular)
+# marks the file as binary.
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+
+# Content kinds returned by _sniff.
+_SIGNATURE = "signature"
+_CONTAINER = "container"
+_SCRIPT = "script"
+_PLAIN = "plain"
+
+_cache: OrderedDict[Identity, tuple[str, str]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def classify(path: Path, mode: int, identity: Identity, read: bool = True) -> str:
+    """Describe a non-directory entry, e.g. "Python" or "PNG Image".
+
+    A recognised signature in the file's first bytes wins over its name,
+    so misnamed files are reported as what they are. A container
+    signature such as ZIP only wins over an extension naming some other
+    known type, so a .docx stays "DOCX". Otherwise a shebang names the
+    interpreter, and the extension table covers the rest; extensionless
+    files fall back to "Text" or "Binary". The bytes read
+    are cached by *identity*, so asking again for an unchanged file
+    doesn't touch the disk. With *read* False nothing is read: a file
+    that isn't cached yet is described by its name alone.
+    """
+    if stat.S_ISFIFO(mode):
+        return "Named Pipe"
+    if stat.S_ISSOCK(mode):
+        return "Socket"
+    if stat.S_ISCHR(mode) or stat.S_ISBLK(mode):
+        return "Device"
+    extension = path.suffix.lstrip(".")
+    kind, label = _sniff(path, identity, read) if stat.S_ISREG(mode) else (_PLAIN, "File")
+    if kind == _SIGNATURE or kind == _SCRIPT:
+        return label
+    known = _EXTENSION_TYPES.get(extension.lower())
+    if kind == _CONTAINER and (known is not None or not extension):
+        return label
+    if known is not None:
+        return known
+    return extension.upper() or label
+
+
+def _sniff(path: Path, identity: Identity, read: bool = True) -> tuple[str, str]:
+    with _lock:
+        cached = _cache.get(identity)
+        if cached is not None:
+            _cache.move_to_end(identity)
+            return cached
+    if not identity[2]:
+        return (_PLAIN, "Empty File")
+    if not read:
+        return (_PLAIN, "File")
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        # Unreadable: go by the name alone, and try again next time.
+        return (_PLAIN, "File")
+    result = _match(head)
+    with _lock:
+        _cache[identity] = result
+        if len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return result
+
+
+def _match(head: bytes) -> tuple[str, str]:
+    for offset, signature, label in _MAGIC:
+        if head.startswith(signature, offset):
+            return (_CONTAINER if label in _CONTAINERS else _SIGNATURE, label)
+    if head.startswith(b"RIFF") and head[8:12] in _RIFF_TYPES:
+        return (_SIGNATURE, _RIFF_TYPES[head[8:12]])
+    if head.startswith(b"ftyp", 4):
+        brand = _FTYP_BRANDS.get(head[8:12])
+        return (_SIGNATURE, brand) if brand is not None else (_CONTAINER, "MP4 Video")
+    if _is_icon(head):
+        return (_SIGNATURE, "Icon")
+    shebang = _SHEBANG.match(head)
+    if shebang is not None:
+        program = shebang[1].rsplit(b"/", 1)[-1]
+        if program == b"env" and shebang[2] is not None:
+            program = shebang[2]
+        name = _VERSION_SUFFIX.sub("", program.decode("ascii", "replace"))
+        return (_SCRIPT, _INTERPRETERS.get(name, "Script"))
+    if head.translate(None, _TEXT_BYTES):
+        return (_PLAIN, "Binary")
+    return (_PLAIN, "Text")
+
+
+def _is_icon(head: bytes) -> bool:
+    # "\x00\x00\x01\x00" alone starts plenty of other binaries, so the
+    # first directory entry has to make sense too: a zero reserved byte,
+    # 0 or 1 colour planes, a real bit depth, and image data right after
+    # the directory.
+    if len(head) < 22 or not head.startswith(b"\x00\x00\x01\x00"):
+        return False
+    count = int.from_bytes(head[4:6], "little")
+    return (
+        count > 0
+        and head[9] == 0
+        and int.from_bytes(head[10:12], "little") in (0, 1)
+        and int.from_bytes(head[12:14], "little") in _ICON_DEPTHS
+        and int.from_bytes(head[18:22], "little") == 6 + 16 * count
+    )
@@ -6,85 +6,284 @@ import grp
 import os
 import pwd
 import stat
-from dataclasses import dataclass, field
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
 import humanize
 
+from shellguide.core.file_types import classify
+from shellguide.core.statx import DETAIL_FIELDS, Statx, statx
+
+# How many detailed stats FileInfo.detailed remembers.
+DETAIL_CACHE_ENTRIES = 1024
+
+# Keyed by the listing's device, inode and mtime. chmod and chown leave
+# those alone, so entries are only shown while a fresh stat is under way.
+_details: OrderedDict[tuple[int, int, float], Statx] = OrderedDict()
+_details_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _user_name(uid: int) -> str:
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+@lru_cache(maxsize=None)
+def _group_name(gid: int) -> str:
+    try:
+        return grp.getgrgid(gid).gr_name
+    except KeyError:
+        return str(gid)
+
 
-@dataclass
 class FileInfo:
-    """Metadata about a single file or directory."""
-
-    path: Path
-    name: str = field(init=False)
-    is_dir: bool = field(init=False)
-    is_symlink: bool = field(init=False)
-    is_hidden: bool = field(init=False)
-    size: int = field(default=0, init=False)
-    modified: datetime = field(default_factory=datetime.now, init=False)
-    permissions: str = field(default="", init=False)
-    owner: str = field(default="", init=False)
-    group: str = field(default="", init=False)
-    extension: str = field(default="", init=False)
-    error: str | None = field(default=None, init=False)
-
-    def __post_init__(self) -> None:
-        self.name = self.path.name
-        self.is_hidden = self.name.startswith(".")
-        self.is_symlink = self.path.is_symlink()
+    """Metadata about a single file or directory.
+
+    Only the raw stat fields are stored. Owner, group, permissions and the
+    human-readable strings are derived when first asked for, so rows that
+    are never displayed in detail never pay for them.
+    """
+
+    __slots__ = (
+        "path",
+        "name",
+        "is_dir",
+        "is_symlink",
+        "size",
+        "mtime",
+        "mode",
+        "uid",
+        "gid",
+        "ino",
+        "dev",
+        "error",
+        "birthtime",
+        "mnt_id",
+    )
 
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name = path.name
+        self.is_symlink = False
+        self.birthtime = None
+        self.mnt_id = None
         try:
-            st = self.path.stat()
-            self.is_dir = self.path.is_dir()
-            self.size = st.st_size if not self.is_dir else 0
-            self.modified = datetime.fromtimestamp(st.st_mtime)
-            self.permissions = stat.filemode(st.st_mode)
-            try:
-                self.owner = pwd.getpwuid(st.st_uid).pw_name
-            except KeyError:
-                self.owner = str(st.st_uid)
+            st = os.lstat(path)
+            self.is_symlink = stat.S_ISLNK(st.st_mode)
+            if self.is_symlink:
+                st = os.stat(path)
+        except OSError as e:
+            self._set_error(e)
+        else:
+            self._apply_stat(st)
+
+    @classmethod
+    def from_fields(
+        cls,
+        path: Path,
+        *,
+        is_dir: bool,
+        is_symlink: bool,
+        size: int,
+        mtime: float,
+        mode: int,
+        uid: int,
+        gid: int,
+        ino: int = 0,
+        dev: int = 0,
+        error: str | None = None,
+    ) -> FileInfo:
+        """Build a FileInfo from already-known stat fields, without I/O."""
+        info = cls.__new__(cls)
+        info.path = path
+        info.name = path.name
+        info.is_dir = is_dir
+        info.is_symlink = is_symlink
+        info.size = size
+        info.mtime = mtime
+        info.mode = mode
+        info.uid = uid
+        info.gid = gid
+        info.ino = ino
+        info.dev = dev
+        info.error = error
+        info.birthtime = None
+        info.mnt_id = None
+        return info
+
+    def detailed(self, dont_sync: bool = False, read: bool = True) -> FileInfo:
+        """A copy with every stat field, plus birth time and mount id.
+
+        Listings on slow mounts only ask for what the table shows, so the
+        info panel calls this for the one entry it describes, off the UI
+        thread. *dont_sync* lets a network filesystem answer from its
+        cached attributes. The result is remembered by device, inode and
+        mtime. With *read* False nothing is stat'ed: the last result
+        remembered for the entry is used, which may predate a chmod or
+        chown, so it is only good for showing something straight away.
+        Returns self if the entry can't be stat'ed, or isn't remembered.
+        """
+        key = (self.dev, self.ino, self.mtime)
+        if not read:
+            with _details_lock:
+                st = _details.get(key) if self.ino else None
+                if st is None:
+                    return self
+                _details.move_to_end(key)
+        else:
             try:
-                self.group = grp.getgrgid(st.st_gid).gr_name
-            except KeyError:
-                self.group = str(st.st_gid)
-            self.extension = self.path.suffix.lstrip(".") if not self.is_dir else ""
-        except (OSError, PermissionError) as e:
-            self.is_dir = False
-            self.error = str(e)
+                st = statx(self.path, DETAIL_FIELDS, dont_sync=dont_sync)
+            except OSError:
+                return self
+            if self.ino:
+                with _details_lock:
+                    _details[key] = st
+                    if len(_details) > DETAIL_CACHE_ENTRIES:
+                        _details.popitem(last=False)
+        info = FileInfo.__new__(FileInfo)
+        info.path = self.path
+        info.name = self.name
+        info.is_symlink = self.is_symlink
+        info._apply_stat(st)
+        # Filesystems that don't record birth time may still report 0.
+        info.birthtime = st.st_birthtime or None
+        info.mnt_id = st.mnt_id
+        return info
+
+    def _apply_stat(self, st: os.stat_result | Statx) -> None:
+        self.is_dir = stat.S_ISDIR(st.st_mode)
+        self.size = st.st_size if not self.is_dir else 0
+        self.mtime = st.st_mtime
+        self.mode = st.st_mode
+        self.uid = st.st_uid
+        self.gid = st.st_gid
+        self.ino = st.st_ino
+        self.dev = st.st_dev
+        self.error = None
+
+    def _set_error(self, error: OSError) -> None:
+        self.is_dir = False
+        self.size = 0
+        self.mtime = 0.0
+        self.mode = 0
+        self.uid = -1
+        self.gid = -1
+        self.ino = 0
+        self.dev = 0
+        self.error = str(error)
+
+    def __repr__(self) -> str:
+        return f"FileInfo(path={self.path!r})"
 
     @property
-    def human_size(self) -> str:
+    def is_hidden(self) -> bool:
+        return self.name.startswith(".")
+
+    @property
+    def extension(self) -> str:
         if self.is_dir:
+            return ""
+        return self.path.suffix.lstrip(".")
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime)
+
+    @property
+    def permissions(self) -> str:
+        return stat.filemode(self.mode) if self.error is None else ""
+
+    @property
+    def owner(self) -> str:
+        return _user_name(self.uid) if self.error is None else ""
+
+    @property
+    def group(self) -> str:
+        return _group_name(self.gid) if self.error is None else ""
+
+    @property
+    def human_size(self) -> str:
+        if self.error is not None:
             return "--"
-        return humanize.naturalsize(self.size, binary=True)
+        return human_size(self.size, self.is_dir)
 
     @property
     def human_modified(self) -> str:
-        return humanize.naturaltime(self.modified)
+        if self.error is not None:
+            return "--"
+        return human_time(self.mtime)
+
+    @property
+    def human_created(self) -> str:
+        if self.birthtime is None:
+            return "--"
+        return human_time(self.birthtime)
 
     @property
     def file_type(self) -> str:
+        """The type as far as it is known without reading the file.
+
+        That is the name's, until :meth:`detect_type` has read the file's
+        first bytes.
+        """
+        return self.detect_type(read=False)
+
+    def detect_type(self, read: bool = True) -> str:
+        """The type, read from the file's first bytes unless they are cached.
+
+        May block on a slow mount, so the UI calls it from a worker.
+        """
         if self.is_dir:
             return "Directory"
         if self.is_symlink:
             return "Symlink"
-        ext_types = {
-            "py": "Python", "js": "JavaScript", "ts": "TypeScript",
-            "html": "HTML", "css": "CSS", "json": "JSON", "yaml": "YAML",
-            "yml": "YAML", "md": "Markdown", "txt": "Text", "sh": "Shell",
-            "bash": "Bash", "zsh": "Zsh", "toml": "TOML", "cfg": "Config",
-            "ini": "Config", "xml": "XML", "csv": "CSV", "sql": "SQL",
-            "rs": "Rust", "go": "Go", "java": "Java", "c": "C",
-            "cpp": "C++", "h": "C Header", "rb": "Ruby", "php": "PHP",
-            "swift": "Swift", "kt": "Kotlin", "r": "R",
-            "png": "PNG Image", "jpg": "JPEG Image", "jpeg": "JPEG Image",
-            "gif": "GIF Image", "svg": "SVG Image", "ico": "Icon",
-            "pdf": "PDF", "zip": "ZIP Archive", "tar": "Tar Archive",
-            "gz": "GZip Archive", "mp3": "MP3 Audio", "mp4": "MP4 Video",
-        }
-        return ext_types.get(self.extension.lower(), self.extension.upper() or "File")
+        return classify(
+            self.path, self.mode, (self.dev, self.ino, self.size, self.mtime), read
+        )
+
+
+def human_size(size: int, is_dir: bool = False) -> str:
+    """Format a byte count the way the file list displays it."""
+    if is_dir:
+        return "--"
+    return humanize.naturalsize(size, binary=True)
+
+
+def human_time(mtime: float, now: float | None = None) -> str:
+    """Format a modification timestamp relative to *now* (default: the clock).
+
+    The text only depends on the age in the unit it is shown in — whole
+    seconds under a minute, rounded minutes under an hour, rounded hours
+    under a day, whole days after that — so ages are cut down to that
+    bucket and each bucket is formatted once.
+    """
+    seconds = int((time.time() if now is None else now) - mtime)
+    if seconds < 0:
+        # Timestamps in the future are rare enough not to cache.
+        return humanize.naturaltime(datetime.fromtimestamp(mtime))
+    if seconds < 60:
+        bucket = seconds
+    elif seconds < 3600:
+        bucket = round(seconds / 60) * 60
+    elif seconds < 86400:
+        bucket = round(seconds / 3600) * 3600
+    else:
+        bucket = seconds // 86400 * 86400
+    return _format_age(bucket)
+
+
+@lru_cache(maxsize=8192)
+def _format_age(seconds: int) -> str:
+    return humanize.naturaltime(timedelta(seconds=seconds))
 
 
 def list_directory(
@@ -92,16 +291,14 @@ def list_directory(
     show_hidden: bool = False,
 ) -> list[FileInfo]:
     """List contents of a directory, returning FileInfo objects."""
-    items: list[FileInfo] = []
-    try:
-        for entry in sorted(path.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower())):
-            info = FileInfo(entry)
-            if not show_hidden and info.is_hidden:
-                continue
-            items.append(info)
-    except PermissionError:
-        pass
-    return items
+    from shellguide.core.fs_cache import listing_cache
+
+    listing = listing_cache.scan(path)
+    return [
+        listing.info(row)
+        for row in range(len(listing))
+        if show_hidden or not listing.is_hidden(row)
+    ]
 
 
 def search_files(
@@ -109,29 +306,59 @@ def search_files(
     query: str,
     show_hidden: bool = False,
     max_results: int = 100,
+    fuzzy: bool = False,
 ) -> list[FileInfo]:
-    """Recursively search for files matching query."""
-    results: list[FileInfo] = []
-    query_lower = query.lower()
-    try:
-        for item in root.rglob("*"):
-            if len(results) >= max_results:
-                break
-            if not show_hidden and any(p.startswith(".") for p in item.parts):
-                continue
-            if query_lower in item.name.lower():
-                results.append(FileInfo(item))
-    except PermissionError:
-        pass
-    return results
+    """Recursively search for files matching query.
+
+    The first *max_results* hits from the saved name index when it covers
+    *root*, otherwise from :func:`shellguide.core.search.iter_search`,
+    which prunes hidden and dependency directories and walks in parallel.
+
+    With *fuzzy*, the *max_results* best fuzzy matches of *query* against
+    whole paths under *root* instead, best first; see
+    :mod:`shellguide.core.fuzzy`. That loads every path under *root*, so
+    for repeated queries keep a :class:`~shellguide.core.fuzzy.FuzzySession`.
+    """
+    from shellguide.core.name_index import name_index
+    from shellguide.core.search import iter_search
+
+    if fuzzy:
+        from shellguide.core.fuzzy import FuzzySession
+
+        session = FuzzySession(root, show_hidden, index=name_index)
+        try:
+            ranked = session.search(query, max_results) or []
+        finally:
+            session.close()
+        return [FileInfo(Path(path)) for _, path in ranked]
+    if name_index.covers(root, show_hidden):
+        with closing(name_index.search(root, query)) as paths:
+            return [FileInfo(Path(path)) for path in islice(paths, max_results)]
+    with closing(iter_search(root, query, show_hidden)) as results:
+        return list(islice(results, max_results))
 
 
 def get_disk_usage(path: Path) -> str:
-    """Get disk usage info for a path."""
+    """Get disk usage info for a path.
+
+    Walks cached listings where they are current, so sizing a directory
+    that has been browsed recently doesn't re-stat its files.
+    """
+    from shellguide.core.fs_cache import listing_cache
+
     try:
         if path.is_file():
             return humanize.naturalsize(path.stat().st_size, binary=True)
-        total = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        total = 0
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            listing = listing_cache.scan(directory, store=False)
+            for row in range(len(listing)):
+                if not listing.is_dir(row):
+                    total += listing.size(row)
+                elif not listing.is_symlink(row):
+                    stack.append(directory / listing.name(row))
         return humanize.naturalsize(total, binary=True)
     except (OSError, PermissionError):
         return "N/A"
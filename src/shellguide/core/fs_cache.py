@@ -0,0 +1,132 @@
+"""Shared, validated cache of directory listings."""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from shellguide.core.file_utils import FileInfo
+from shellguide.core.listing import DirectoryListing, scan_directory
+
+# Default memory budget for cached listings (bytes).
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+Signature = tuple[int, int, int]
+
+
+def directory_signature(path: Path) -> Signature | None:
+    """Identity and mtime of a directory, or None if it can't be stat'ed.
+
+    Adding, removing or renaming an entry bumps the directory's mtime, so
+    a listing taken under one signature is still valid while it matches.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns)
+
+
+class ListingCache:
+    """LRU of DirectoryListing snapshots, bounded by their total size.
+
+    Every lookup re-stats the directory and drops the entry if its
+    signature moved on, so a hit costs one syscall instead of a full
+    listing. Cached snapshots are shared between widgets and threads and
+    must not be mutated — take a ``copy()`` before patching one. They hold
+    every entry, dotfiles included, so one listing per directory serves
+    both settings of the hidden-files toggle.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Path, tuple[Signature, DirectoryListing]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, path: Path) -> DirectoryListing | None:
+        """Return the cached listing for *path* if it is still current."""
+        entry = self.lookup(path)
+        return entry[1] if entry is not None else None
+
+    def lookup(self, path: Path) -> tuple[Signature, DirectoryListing] | None:
+        """Like :meth:`get`, but also return the signature the listing matches."""
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if directory_signature(path) != entry[0]:
+            self.discard(path)
+            return None
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        return entry
+
+    def put(self, listing: DirectoryListing, signature: Signature | None) -> None:
+        """Cache *listing*, taken while the directory had *signature*.
+
+        The listing must show every entry: a fresh scan or a ``copy()``.
+        """
+        if signature is None:
+            return
+        key = listing.path
+        size = listing.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1].nbytes
+            self._entries[key] = (signature, listing)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def discard(self, path: Path) -> None:
+        """Forget the cached listing of *path*."""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._nbytes -= entry[1].nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def scan(self, path: Path, store: bool = True) -> DirectoryListing:
+        """Return a current listing of *path*, from memory when possible.
+
+        With *store* off a miss is scanned but not cached, for bulk walks
+        that would otherwise flush everything useful out of the LRU.
+        """
+        listing = self.get(path)
+        if listing is not None:
+            return listing
+        signature = directory_signature(path)
+        listing = scan_directory(path)
+        if store:
+            self.put(listing, signature)
+        return listing
+
+    def info(self, path: Path) -> FileInfo | None:
+        """FileInfo for *path* from its parent's cached listing, if any."""
+        listing = self.get(path.parent)
+        if listing is None:
+            return None
+        row = listing.find(path.name, True)
+        if row is None:
+            row = listing.find(path.name, False)
+        return listing.info(row) if row is not None else None
+
+
+listing_cache = ListingCache()
+"""The process-wide cache every listing consumer shares."""
@@ -0,0 +1,385 @@
+"""fzf-style fuzzy path matching over a packed, in-memory path arena.
+
+A query matches a path when its characters appear in it in order, not
+necessarily together: "srcmain" matches ``src/shellguide/main.py``.
+Matches are scored after fzf — characters at the start of a path
+segment or word score more, runs of consecutive characters more still,
+gaps cost — and only the best few are kept, in a bounded heap, so a
+broad query over a million paths never sorts them all.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from shellguide.core.search import EXCLUDED_DIRS, iter_matches
+
+if TYPE_CHECKING:
+    from shellguide.core.name_index import NameIndex
+
+# Scores, after fzf's.
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_SEGMENT = 10  # first character of the path or of a path segment
+BONUS_BOUNDARY = 8  # after any other non-alphanumeric: "_", "-", ".", " "
+BONUS_CAMEL = 7  # lower to upper case, or into a run of digits
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+BONUS_BASENAME = 2  # each character matched in the last segment
+
+# Paths per arena chunk. Each chunk is one regex scan, holding the GIL
+# for a few milliseconds at most, and a chance to notice cancellation.
+CHUNK_PATHS = 4096
+
+_POSSESSIVE = sys.version_info >= (3, 11)
+
+# How often a search reports its best matches so far (seconds).
+PROGRESS_INTERVAL = 0.1
+
+Ranked = list[tuple[int, str]]
+"""(score, path) pairs, best first."""
+
+
+def _fold(text: str) -> str:
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # A few characters lower-case to two ("İ"); keep those as they are
+    # so offsets into the folded text still fit the original.
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _pattern(query: str) -> re.Pattern[str]:
+    """Regex for a line holding *query* in order, with one group per character.
+
+    Matches run to the end of the line, and each character is matched at
+    its first occurrence after the one before: if the rest doesn't follow
+    the first occurrence of the first character, it can't follow a later
+    one. With possessive runs (Python 3.11+) such a line fails in one
+    pass. Without them the match is made to succeed at that first
+    occurrence regardless, so every line is tried once; check that the
+    last group is set.
+    """
+    chars = [re.escape(c) for c in query]
+    if _POSSESSIVE:
+        rest = "".join(f"[^\\n{c}]*+({c})" for c in chars[1:])
+        return re.compile(f"({chars[0]}){rest}[^\\n]*+")
+    rest = "".join(f"[^\\n{c}]*({c})" for c in chars[1:])
+    return re.compile(f"({chars[0]})(?:{rest}[^\\n]*|[^\\n]*)")
+
+
+# Bonus for a character by the one before it, where that decides it.
+_BONUS_AFTER = {
+    **{chr(c): BONUS_BOUNDARY for c in range(128) if not chr(c).isalnum()},
+    "/": BONUS_SEGMENT,
+    "\n": BONUS_SEGMENT,
+}
+
+
+def _score(text: str, positions: Iterable[int], basename: int) -> int:
+    """Score a match at *positions* in *text*; *basename* is where the last segment starts."""
+    after = _BONUS_AFTER.get
+    score = 0
+    previous = -2
+    # The bonus of the first character of the current run, which the
+    # rest of the run inherits.
+    run_bonus = 0
+    multiplier = BONUS_FIRST_CHAR_MULTIPLIER
+    for i in positions:
+        before = text[i - 1]
+        bonus = after(before)
+        if bonus is None:
+            if not before.isalnum():
+                bonus = BONUS_BOUNDARY
+            elif (before.islower() and text[i].isupper()) or (
+                text[i].isdigit() and not before.isdigit()
+            ):
+                bonus = BONUS_CAMEL
+            else:
+                bonus = 0
+        if i == previous + 1:
+            if bonus >= BONUS_BOUNDARY and bonus > run_bonus:
+                run_bonus = bonus
+            if bonus < run_bonus:
+                bonus = run_bonus
+            if bonus < BONUS_CONSECUTIVE:
+                bonus = BONUS_CONSECUTIVE
+        else:
+            if previous >= 0:
+                score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (i - previous - 2)
+            run_bonus = bonus
+        score += SCORE_MATCH + bonus * multiplier
+        multiplier = 1
+        if i >= basename:
+            score += BONUS_BASENAME
+        previous = i
+    return score
+
+
+def _best_score(length: int) -> int:
+    """The highest score a query of *length* characters can get.
+
+    All of it in the name, in one run that starts a path segment.
+    """
+    return (
+        (SCORE_MATCH + BONUS_BASENAME) * length
+        + BONUS_SEGMENT * BONUS_FIRST_CHAR_MULTIPLIER
+        + BONUS_SEGMENT * (length - 1)
+    )
+
+
+def _ranked(heap: list[tuple[int, int, int, str]]) -> Ranked:
+    return [(score, path) for score, _, _, path in sorted(heap, reverse=True)]
+
+
+def _narrows(old: str, new: str) -> bool:
+    """Whether every path *new* matches is also matched by *old*."""
+    if old == old.lower():
+        new = new.lower()
+    chars = iter(new)
+    return all(c in chars for c in old)
+
+
+class PathArena:
+    """Paths packed into a few large strings, one per line, for matching in bulk.
+
+    A million paths cost about their length in bytes instead of a
+    million string objects, and matching scans each chunk with one regex
+    call. Paths with a newline in them are left out.
+    """
+
+    __slots__ = ("_chunks", "_count")
+
+    def __init__(self, paths: Iterable[str] = ()) -> None:
+        # "\n"-separated paths with a "\n" at each end.
+        self._chunks: list[str] = []
+        self._count = 0
+        batch: list[str] = []
+        for path in paths:
+            if "\n" in path:
+                continue
+            batch.append(path)
+            if len(batch) == CHUNK_PATHS:
+                self._pack(batch)
+                batch = []
+        if batch:
+            self._pack(batch)
+
+    def _pack(self, paths: list[str]) -> None:
+        self._chunks.append("\n" + "\n".join(paths) + "\n")
+        self._count += len(paths)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for text in self._chunks:
+            yield from text[1:-1].split("\n")
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        cancelled: Callable[[], bool] = lambda: False,
+        progress: Callable[[Ranked], None] | None = None,
+    ) -> tuple[Ranked, PathArena] | None:
+        """The *limit* best matches for *query*, and an arena of every match.
+
+        Case-insensitive unless *query* has an upper-case letter, like
+        fzf's smart case. Ties go to the shorter path. The arena of
+        matches answers a longer query that :func:`_narrows` this one
+        without rescanning everything. *progress*, if given, is called
+        with the best matches so far every PROGRESS_INTERVAL seconds
+        while they change. None if *cancelled* returned True first.
+        """
+        if not query:
+            return [], self
+        sensitive = query != query.lower()
+        pattern = _pattern(query)
+        last = len(query)
+        groups = range(1, last + 1)
+        # Once the heap is full a path is only scored if it could beat
+        # the worst kept: if its score can't reach *top* — or *top* less
+        # a gap, when the query isn't in it as one run — it is skipped.
+        top = _best_score(last)
+        gapped = top + SCORE_GAP_START
+        # (score, -length, -serial, path): the serial keeps paths from
+        # being compared, and earlier paths win among equals.
+        best: list[tuple[int, int, int, str]] = []
+        # (score, -length) of the worst kept, once there are *limit*.
+        floor: tuple[float, int] = (float("-inf"), 0)
+        matched: list[str] = []
+        serial = 0
+        report_at = time.monotonic() + PROGRESS_INTERVAL
+        reported = 0
+        for text in self._chunks:
+            if cancelled():
+                return None
+            if progress is not None and serial != reported and time.monotonic() >= report_at:
+                progress(_ranked(best))
+                report_at = time.monotonic() + PROGRESS_INTERVAL
+                reported = serial
+            # Folded per search: a chunk lower-cases in a fraction of
+            # the time it takes to scan, and the arena stays half the size.
+            haystack = text if sensitive else _fold(text)
+            for m in pattern.finditer(haystack):
+                if m.lastindex != last:
+                    continue
+                start = haystack.rfind("\n", 0, m.start()) + 1
+                end = m.end()
+                path = text[start:end]
+                matched.append(path)
+                serial += 1
+                length = start - end
+                if (top, length) <= floor or (
+                    (gapped, length) <= floor and haystack.find(query, start, end) < 0
+                ):
+                    continue
+                basename = haystack.rfind("/", start, end) + 1 or start
+                score = _score(text, map(m.start, groups), basename)
+                if m.start() < basename:
+                    # Matched partly in the parent directories; see
+                    # whether the name alone does better.
+                    alt = pattern.search(haystack, basename, end)
+                    if alt is not None and alt.lastindex == last:
+                        score = max(score, _score(text, map(alt.start, groups), basename))
+                item = (score, length, -serial, path)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+                else:
+                    continue
+                if len(best) == limit:
+                    floor = best[0][:2]
+        return _ranked(best), PathArena(matched)
+
+
+class FuzzySession:
+    """Fuzzy searches under one root, sharing one arena of every path in it.
+
+    The arena is loaded on a background thread the first time it is
+    needed — from *index* when that covers the root, by a walk
+    otherwise — and kept for the session. Each search also keeps the
+    arena of its matches, so a query that only adds characters ranks
+    just those.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        show_hidden: bool = False,
+        exclude: Collection[str] = EXCLUDED_DIRS,
+        index: NameIndex | None = None,
+    ) -> None:
+        self.root = root
+        self.show_hidden = show_hidden
+        self.exclude = exclude
+        self.index = index
+        self._arena: PathArena | None = None
+        self._loaded = threading.Event()
+        self._loader: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last: tuple[str, PathArena] | None = None
+
+    def refines(self, query: str) -> bool:
+        """Whether *query* can be ranked from the previous search's matches."""
+        last = self._last
+        return last is not None and _narrows(last[0], query)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        cancelled: Callable[[], bool] = lambda: False,
+        progress: Callable[[Ranked], None] | None = None,
+    ) -> Ranked | None:
+        """The *limit* best paths for *query*, best first, or None if cancelled.
+
+        *progress* is passed on to :meth:`PathArena.search`, with the
+        paths made absolute like the result. Paths that no longer exist
+        are left out.
+        """
+        self.load()
+        last = self._last
+        if last is not None and _narrows(last[0], query):
+            arena = last[1]
+        else:
+            while not self._loaded.wait(0.05):
+                if cancelled():
+                    return None
+            arena = self._arena
+        if arena is None:
+            return None
+        prefix = os.path.join(self.root, "")
+
+        def absolute(ranked: Ranked) -> Ranked:
+            # An arena from the index can hold paths deleted since.
+            return [
+                (score, prefix + path) for score, path in ranked
+                if os.path.lexists(prefix + path)
+            ]
+
+        result = arena.search(
+            query, limit, cancelled,
+            None if progress is None else lambda ranked: progress(absolute(ranked)),
+        )
+        if result is None:
+            return None
+        ranked, matched = result
+        with self._lock:
+            self._last = (query, matched)
+        return absolute(ranked)
+
+    def load(self) -> None:
+        """Start reading the paths under the root, if that hasn't started yet.
+
+        The first search does it anyway; calling this ahead of it, when
+        fuzzy matching is switched on, hides the wait behind typing.
+        """
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(
+                    target=self._load, name="fuzzy-load", daemon=True
+                )
+                self._loader.start()
+
+    def close(self) -> None:
+        """Stop loading the arena, if that is still going on."""
+        self._stop.set()
+
+    def _load(self) -> None:
+        try:
+            self._arena = self._read_paths()
+        finally:
+            self._loaded.set()
+
+    def _read_paths(self) -> PathArena | None:
+        prefix = len(os.path.join(self.root, ""))
+        if (
+            self.index is not None
+            and self.exclude == EXCLUDED_DIRS
+            and self.index.covers(self.root, self.show_hidden)
+        ):
+            paths = self.index.paths(self.root)
+        else:
+            # Every name contains the empty string.
+            paths = iter_matches(
+                self.root, "", self.show_hidden, self.exclude, self._stop.is_set
+            )
+        try:
+            arena = PathArena(path[prefix:] for path in paths)
+        finally:
+            paths.close()
+        # Stopped part way through, it is incomplete.
+        return None if self._stop.is_set() else arena
@@ -0,0 +1,114 @@
+"""Back/forward navigation history."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from shellguide.core.fs_cache import Signature, directory_signature
+from shellguide.core.listing import DirectoryListing
+
+# How many directories each of the back and forward stacks remembers.
+MAX_ENTRIES = 100
+
+# Memory budget for listing snapshots held by history entries (bytes).
+SNAPSHOT_BUDGET = 32 * 1024 * 1024
+
+Anchor = tuple[str, bool, int, int]
+"""Highlighted name, whether it is a directory, its row and its viewport offset."""
+
+
+@dataclass
+class HistoryEntry:
+    """A directory that was left, and where the cursor was in it."""
+
+    path: Path
+    anchor: Anchor | None = None
+    listing: DirectoryListing | None = None
+    signature: Signature | None = None
+
+    def snapshot(self) -> DirectoryListing | None:
+        """The saved listing, if the directory hasn't changed since it was taken."""
+        listing = self.listing
+        if listing is None:
+            return None
+        if self.signature is None or directory_signature(self.path) != self.signature:
+            return None
+        return listing
+
+
+class NavigationHistory:
+    """Back and forward stacks of HistoryEntry records.
+
+    Each entry owns the listing the table was showing when it was left,
+    so going back can redraw it without touching the disk. Snapshots are
+    kept for the most recently left directories only: once they add up to
+    more than *max_bytes* the oldest are dropped, and those entries fall
+    back to a normal reload that still lands on the remembered file.
+    """
+
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, max_bytes: int = SNAPSHOT_BUDGET
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._back: list[HistoryEntry] = []
+        self._forward: list[HistoryEntry] = []
+        self._snapshots: OrderedDict[int, HistoryEntry] = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def can_go_back(self) -> bool:
+        return bool(self._back)
+
+    @property
+    def can_go_forward(self) -> bool:
+        return bool(self._forward)
+
+    def visit(self, left: HistoryEntry) -> None:
+        """Record leaving *left* for a new directory; clears the forward stack."""
+        for entry in self._forward:
+            self._forget(entry)
+        self._forward.clear()
+        self._push(self._back, left)
+
+    def back(self, current: HistoryEntry) -> HistoryEntry | None:
+        """Step back from *current*, returning the entry to show."""
+        return self._step(self._back, self._forward, current)
+
+    def forward(self, current: HistoryEntry) -> HistoryEntry | None:
+        """Step forward from *current*, returning the entry to show."""
+        return self._step(self._forward, self._back, current)
+
+    def _step(
+        self,
+        source: list[HistoryEntry],
+        target: list[HistoryEntry],
+        current: HistoryEntry,
+    ) -> HistoryEntry | None:
+        while source:
+            entry = source.pop()
+            self._forget(entry)
+            # Skip directories that have been removed since.
+            if entry.path.is_dir() and entry.path != current.path:
+                self._push(target, current)
+                return entry
+        return None
+
+    def _push(self, stack: list[HistoryEntry], entry: HistoryEntry) -> None:
+        stack.append(entry)
+        if len(stack) > self.max_entries:
+            self._forget(stack.pop(0))
+        if entry.listing is None:
+            return
+        self._snapshots[id(entry)] = entry
+        self._nbytes += entry.listing.nbytes
+        while self._nbytes > self.max_bytes:
+            _, oldest = self._snapshots.popitem(last=False)
+            self._nbytes -= oldest.listing.nbytes
+            oldest.listing = None
+
+    def _forget(self, entry: HistoryEntry) -> None:
+        if self._snapshots.pop(id(entry), None) is not None:
+            self._nbytes -= entry.listing.nbytes
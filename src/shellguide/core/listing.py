@@ -0,0 +1,1034 @@
+"""Columnar directory snapshots for large listings."""
+
+from __future__ import annotations
+
+import os
+import queue
+import re
+import stat
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
+from itertools import compress, repeat
+from operator import contains
+from pathlib import Path
+
+from shellguide.core import uring
+from shellguide.core.file_utils import FileInfo
+from shellguide.core.statx import LISTING_FIELDS, Statx, statx
+
+_FS_ENCODING = sys.getfilesystemencoding()
+_FS_ERRORS = sys.getfilesystemencodeerrors()
+
+# Size of the first snapshot streamed by scan_directory_batches — about
+# one screenful. Later snapshots double in size.
+FIRST_BATCH = 64
+
+# Threads stat_entries runs per directory, and how long one stat call may
+# take before its entry is given up on (seconds).
+STAT_WORKERS = 16
+STAT_TIMEOUT = 5.0
+
+# Fetch complete listings' metadata in io_uring batches where the kernel
+# allows it. Off by default: on local disks it measured slower than
+# scandir and stat (see benchmarks/stat_backends.py).
+BATCH_STAT = os.environ.get("SHELLGUIDE_IO_URING") == "1"
+
+# Bits in the per-entry flags column.
+_IS_DIR = 1
+_IS_SYMLINK = 2
+_HAS_ERROR = 4
+_IS_HIDDEN = 8
+_PENDING = 16
+
+# Indexed by a flags byte: 1 for entries shown while dotfiles are hidden.
+_SHOWN = bytes(0 if flags & _IS_HIDDEN else 1 for flags in range(256))
+
+_DIGITS = re.compile(r"(\d+)")
+
+StatResult = tuple[int, Statx | None, OSError | None]
+"""An entry index and what stat'ing it returned or raised."""
+
+
+class SortMode(Enum):
+    NAME = "name"
+    NATURAL = "natural"
+    SIZE = "size"
+    MTIME = "modified"
+    EXTENSION = "extension"
+
+    @property
+    def ls_flag(self) -> str:
+        """The ``ls`` option that gives the same order."""
+        return _LS_FLAGS[self]
+
+
+_LS_FLAGS = {
+    SortMode.NAME: "",
+    SortMode.NATURAL: "v",
+    SortMode.SIZE: "S",
+    SortMode.MTIME: "t",
+    SortMode.EXTENSION: "X",
+}
+
+
+def _natural_key(name: str) -> tuple[str | int, ...]:
+    """Split digit runs out of *name* so "file2" sorts before "file10"."""
+    parts = _DIGITS.split(name.lower())
+    parts[1::2] = [int(p) for p in parts[1::2]]
+    return tuple(parts)
+
+
+def _extension_key(name: str) -> str:
+    dot = name.rfind(".")
+    return name[dot + 1:].lower() if dot > 0 else ""
+
+
+class DirectoryListing:
+    """Compact snapshot of one directory's entries.
+
+    Names live back to back in a single byte arena and every stat field
+    has its own typed array, so an entry costs a few dozen bytes rather
+    than a full FileInfo. Each name is followed by a "/" (which can't occur
+    in a name), so the whole arena can be split in one call. Rows are
+    addressed in display order; a FileInfo is only built when
+    :meth:`info` is called for a specific row.
+
+    Entries are always indexed by name as well as in display order, so
+    switching :class:`SortMode` is a stable sort of that index on columns
+    already in memory. Directories stay ahead of files in every mode.
+    Dotfiles are always read and kept. Hiding them (:meth:`set_show_hidden`)
+    and a name filter (:meth:`set_filter`) both narrow the rows to a
+    subsequence of that order without touching the entries themselves.
+    """
+
+    __slots__ = (
+        "path",
+        "show_hidden",
+        "sort_mode",
+        "reverse",
+        "_arena",
+        "_offsets",
+        "_sizes",
+        "_mtimes",
+        "_modes",
+        "_inodes",
+        "_devs",
+        "_uids",
+        "_gids",
+        "_flags",
+        "_errors",
+        "_by_name",
+        "_order",
+        "_ndirs",
+        "_nhidden",
+        "_derived",
+        "_needle",
+        "_folded",
+        "_view",
+        "_view_names",
+        "_view_ndirs",
+        "_views",
+    )
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.show_hidden = True
+        self.sort_mode = SortMode.NAME
+        self.reverse = False
+        self._arena = bytearray()
+        self._offsets = array("Q", [0])
+        self._sizes = array("q")
+        self._mtimes = array("d")
+        self._modes = array("I")
+        self._inodes = array("Q")
+        self._devs = array("Q")
+        self._uids = array("I")
+        self._gids = array("I")
+        self._flags = array("B")
+        self._errors: dict[int, str] = {}
+        self._by_name = array("I")
+        self._order = array("I")
+        self._ndirs = 0
+        self._nhidden = 0
+        self._derived: dict[SortMode, list] = {}
+        self._needle = ""
+        self._folded: list[str] | None = None
+        self._view: list[int] | None = None
+        self._view_names: list[str] = []
+        self._view_ndirs = 0
+        self._views: list[tuple[str, list[int], list[str]]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows()[0])
+
+    def __iter__(self) -> Iterator[FileInfo]:
+        for row in range(len(self)):
+            yield self.info(row)
+
+    @property
+    def total(self) -> int:
+        """Number of entries before filtering; dotfiles count only while shown."""
+        if self.show_hidden:
+            return len(self._order)
+        return len(self._order) - self._nhidden
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the snapshot's buffers."""
+        columns = (
+            self._offsets, self._sizes, self._mtimes, self._modes,
+            self._inodes, self._devs, self._uids, self._gids, self._flags,
+            self._by_name, self._order,
+        )
+        return len(self._arena) + sum(len(c) * c.itemsize for c in columns)
+
+    # ── Row accessors (display order) ───────────────────────────
+
+    def name(self, row: int) -> str:
+        return self._name(self._index(row))
+
+    def is_dir(self, row: int) -> bool:
+        return bool(self._flags[self._index(row)] & _IS_DIR)
+
+    def is_symlink(self, row: int) -> bool:
+        return bool(self._flags[self._index(row)] & _IS_SYMLINK)
+
+    def is_hidden(self, row: int) -> bool:
+        return bool(self._flags[self._index(row)] & _IS_HIDDEN)
+
+    def is_pending(self, row: int) -> bool:
+        """Whether the row was listed by :func:`list_names` and not stat'ed yet."""
+        return bool(self._flags[self._index(row)] & _PENDING)
+
+    def directories(self) -> list[str]:
+        """Names of every subdirectory, dotted ones included, in name order."""
+        return [self._name(i) for i in self._by_name[:self._ndirs]]
+
+    def size(self, row: int) -> int:
+        return self._sizes[self._index(row)]
+
+    def mtime(self, row: int) -> float:
+        return self._mtimes[self._index(row)]
+
+    def inode(self, row: int) -> int:
+        return self._inodes[self._index(row)]
+
+    def find(self, name: str, is_dir: bool) -> int | None:
+        """Return the row showing *name*, or None if it isn't listed."""
+        i = self._lookup(name, is_dir)
+        if i is None:
+            return None
+        rows, ndirs = self._rows()
+        pos = self._locate(rows, i, self._mode_key)
+        return self._flip(pos, len(rows), ndirs) if pos is not None else None
+
+    def info(self, row: int) -> FileInfo:
+        """Materialize a FileInfo for a single row."""
+        i = self._index(row)
+        flags = self._flags[i]
+        name = self._name(i)
+        error = "Not loaded yet" if flags & _PENDING else self._errors.get(i)
+        return FileInfo.from_fields(
+            self.path / name,
+            is_dir=bool(flags & _IS_DIR),
+            is_symlink=bool(flags & _IS_SYMLINK),
+            size=self._sizes[i],
+            mtime=self._mtimes[i],
+            mode=self._modes[i],
+            uid=self._uids[i],
+            gid=self._gids[i],
+            ino=self._inodes[i],
+            dev=self._devs[i],
+            error=error,
+        )
+
+    # ── Incremental updates ─────────────────────────────────────
+
+    def update(self, name: str) -> bool:
+        """Re-stat *name* and add, refresh or drop its row to match disk.
+
+        Only that one entry is touched, so keeping a large listing current
+        after a known change costs a couple of syscalls instead of a full
+        rescan. Returns True if the listing changed.
+        """
+        path = self.path / name
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            return self._drop(name)
+        except OSError:
+            return False
+        is_symlink = stat.S_ISLNK(st.st_mode)
+        error = None
+        if is_symlink:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                st, error = None, e
+        return self._put(name, st, is_symlink, error)
+
+    def adopt(self, other: DirectoryListing, names: Iterable[str]) -> bool:
+        """Make the rows for *names* match *other*, a newer scan of the directory.
+
+        Like :meth:`update` for each name, but the fields are copied from
+        *other* rather than stat'ed again, so nothing touches the disk.
+        Returns True if the listing changed.
+        """
+        changed = False
+        for name in names:
+            j = other._entry(name)
+            if j is None:
+                changed = self._drop(name) or changed
+            else:
+                changed = self._put(name, *other._fields(j)) or changed
+        return changed
+
+    def _entry(self, name: str) -> int | None:
+        i = self._lookup(name, True)
+        return i if i is not None else self._lookup(name, False)
+
+    def _fields(self, i: int) -> tuple[os.stat_result | None, bool, OSError | None]:
+        """Entry *i*'s fields in the form :meth:`_store` takes them."""
+        is_symlink = bool(self._flags[i] & _IS_SYMLINK)
+        error = self._errors.get(i)
+        if error is not None:
+            return None, is_symlink, OSError(error)
+        st = os.stat_result((
+            self._modes[i], self._inodes[i], self._devs[i], 0, self._uids[i],
+            self._gids[i], self._sizes[i], 0, self._mtimes[i], 0,
+        ))
+        return st, is_symlink, None
+
+    def _drop(self, name: str) -> bool:
+        i = self._entry(name)
+        if i is None:
+            return False
+        self._remove(i)
+        return True
+
+    def _put(
+        self,
+        name: str,
+        st: os.stat_result | None,
+        is_symlink: bool,
+        error: OSError | None,
+    ) -> bool:
+        """Add *name*'s row, or overwrite it, with the given fields."""
+        i = self._entry(name)
+        if i is not None:
+            before = self._signature(i)
+            # New fields can move the entry (a size change under -S), so
+            # take it out under its old sort keys and put it back.
+            self._remove(i)
+            self._store(i, st, is_symlink, error)
+            self._insert(i)
+            return self._signature(i) != before
+
+        self._insert(self._append(os.fsencode(name), st, is_symlink, error))
+        return True
+
+    def fill(self, results: list[StatResult]) -> list[str]:
+        """Store stat results for entries listed by :func:`list_names`.
+
+        *results* are (entry, stat, error) as yielded by :func:`stat_entries`.
+        Rows are only re-sorted when the new fields can move them: in size
+        and mtime order, or when an entry turned out to be a directory.
+        Returns the names that were filled in.
+        """
+        flags = self._flags
+        regroup = False
+        names = []
+        for i, st, error in results:
+            if not flags[i] & _PENDING:
+                continue
+            was_dir = flags[i] & _IS_DIR
+            self._store(i, st, bool(flags[i] & _IS_SYMLINK), error)
+            regroup = regroup or (flags[i] & _IS_DIR) != was_dir
+            names.append(self._name(i))
+        if regroup:
+            self._sort()
+        elif names and self.sort_mode in (SortMode.SIZE, SortMode.MTIME):
+            self._order = self._ordered()
+            self._refilter()
+        return names
+
+    def _insert(self, i: int) -> None:
+        """Place entry *i* at its sorted position in both orders."""
+        by_name = self._by_name
+        by_name.insert(bisect_left(by_name, self._name_key(i), key=self._name_key), i)
+        order = self._order
+        pos = bisect_left(order, self._mode_key(i), key=self._mode_key)
+        order.insert(pos, i)
+        flags = self._flags[i]
+        is_dir = flags & _IS_DIR
+        if is_dir:
+            self._ndirs += 1
+        if flags & _IS_HIDDEN:
+            self._nhidden += 1
+            if self._view is None and not self.show_hidden:
+                # The first dotfile: from now on the rows need narrowing.
+                self._refilter()
+                return
+        if self._folded is None:
+            return
+        folded = self._name(i).lower()
+        self._folded.insert(pos, folded)
+        view = self._view
+        if view is None:
+            return
+        if self._needle in folded and (self.show_hidden or _SHOWN[flags]):
+            pos = bisect_left(view, self._mode_key(i), key=self._mode_key)
+            view.insert(pos, i)
+            self._view_names.insert(pos, folded)
+            if is_dir:
+                self._view_ndirs += 1
+        # Matches kept for shorter queries no longer reflect the entries.
+        self._views = [(self._needle, view, self._view_names)]
+
+    def _remove(self, i: int) -> None:
+        """Drop entry *i* from both orders; its fields stay in the columns."""
+        del self._by_name[self._locate(self._by_name, i, self._name_key)]
+        pos = self._locate(self._order, i, self._mode_key)
+        del self._order[pos]
+        flags = self._flags[i]
+        is_dir = flags & _IS_DIR
+        if is_dir:
+            self._ndirs -= 1
+        if flags & _IS_HIDDEN:
+            self._nhidden -= 1
+        if self._folded is None:
+            return
+        del self._folded[pos]
+        view = self._view
+        if view is None:
+            return
+        pos = self._locate(view, i, self._mode_key)
+        if pos is not None:
+            del view[pos]
+            del self._view_names[pos]
+            if is_dir:
+                self._view_ndirs -= 1
+        self._views = [(self._needle, view, self._view_names)]
+
+    def _lookup(self, name: str, is_dir: bool) -> int | None:
+        """Entry index of *name*, found by bisecting the name index."""
+        by_name = self._by_name
+        key = (not is_dir, name.lower(), name)
+        pos = bisect_left(by_name, key, key=self._name_key)
+        if pos < len(by_name) and self._name_key(by_name[pos]) == key:
+            return by_name[pos]
+        return None
+
+    @staticmethod
+    def _locate(
+        order: array | list[int], i: int, key: Callable[[int], tuple]
+    ) -> int | None:
+        """Position of entry *i* in *order*, which is sorted by *key*."""
+        pos = bisect_left(order, key(i), key=key)
+        return pos if pos < len(order) and order[pos] == i else None
+
+    # ── Sorting ─────────────────────────────────────────────────
+
+    def sort_by(self, mode: SortMode, reverse: bool = False) -> None:
+        """Re-order rows for *mode* using the fields already loaded.
+
+        Nothing is re-read from disk: size and mtime orders sort on their
+        columns, and derived keys (extension, natural name) are computed
+        once per entry and kept.
+        """
+        self.reverse = reverse
+        if mode is not self.sort_mode:
+            self.sort_mode = mode
+            self._order = self._ordered()
+            self._refilter()
+
+    def _rows(self) -> tuple[array | list[int], int]:
+        """The entries on display and how many of them are directories."""
+        if self._view is not None:
+            return self._view, self._view_ndirs
+        return self._order, self._ndirs
+
+    def _index(self, row: int) -> int:
+        rows, ndirs = self._rows()
+        return rows[self._flip(row, len(rows), ndirs)]
+
+    def _flip(self, pos: int, count: int, ndirs: int) -> int:
+        """Map a row to its position in the sorted rows (and back) when reversed."""
+        if not self.reverse:
+            return pos
+        if pos < ndirs:
+            return ndirs - 1 - pos
+        return count - 1 - (pos - ndirs)
+
+    def _ordered(self) -> array:
+        """Display order for the current mode, derived from the name index.
+
+        The name index is sorted by name within each group, and Python's
+        sort is stable, so sorting it on one column yields that column
+        with ties broken by name — exactly what :meth:`_mode_key` says.
+        """
+        mode = self.sort_mode
+        if mode is SortMode.NAME:
+            return self._by_name[:]
+        if mode is SortMode.SIZE:
+            key, descending = self._sizes.__getitem__, True
+        elif mode is SortMode.MTIME:
+            key, descending = self._mtimes.__getitem__, True
+        else:
+            key, descending = self._derived_keys(mode).__getitem__, False
+        ndirs = self._ndirs
+        order = array("I", sorted(self._by_name[:ndirs], key=key, reverse=descending))
+        order.extend(sorted(self._by_name[ndirs:], key=key, reverse=descending))
+        return order
+
+    def _derived_keys(self, mode: SortMode) -> list:
+        """Per-entry keys for *mode*, extended for entries added since."""
+        keys = self._derived.setdefault(mode, [])
+        make = _natural_key if mode is SortMode.NATURAL else _extension_key
+        for i in range(len(keys), len(self._flags)):
+            keys.append(make(self._name(i)))
+        return keys
+
+    def _name_key(self, i: int) -> tuple[bool, str, str]:
+        name = self._name(i)
+        return (not self._flags[i] & _IS_DIR, name.lower(), name)
+
+    def _mode_key(self, i: int) -> tuple:
+        """Full sort key of entry *i* under the current mode."""
+        mode = self.sort_mode
+        group, folded, name = self._name_key(i)
+        if mode is SortMode.NAME:
+            return (group, folded, name)
+        if mode is SortMode.SIZE:
+            primary = -self._sizes[i]
+        elif mode is SortMode.MTIME:
+            primary = -self._mtimes[i]
+        else:
+            primary = self._derived_keys(mode)[i]
+        return (group, primary, folded, name)
+
+    # ── Filtering ───────────────────────────────────────────────
+
+    @property
+    def filter(self) -> str:
+        return self._needle
+
+    def set_filter(self, query: str) -> None:
+        """Show only rows whose name contains *query*, ignoring case.
+
+        A query that extends the previous one is matched against the
+        previous matches only, and the matches of each shorter query are
+        kept, so typing scans an ever smaller set and backspace is free.
+        Matching runs in C-level iterators over lower-cased names kept in
+        display order, with no per-row Python code.
+        """
+        needle = query.lower()
+        if needle == self._needle:
+            return
+        self._needle = needle
+        self._update_view()
+
+    def set_show_hidden(self, show: bool) -> None:
+        """Show or hide dotfiles; they stay loaded either way."""
+        if show == self.show_hidden:
+            return
+        self.show_hidden = show
+        if show:
+            self._views = []
+        else:
+            # Dropping dotfiles only narrows the matches already computed.
+            self._views = [
+                (needle, *self._drop_hidden(rows, names))
+                for needle, rows, names in self._views
+            ]
+        self._update_view()
+
+    def prepare_filter(self) -> None:
+        """Fold every name up front, so the first keystroke doesn't pay for it."""
+        self._folded_names()
+
+    def _refilter(self) -> None:
+        """Recompute the filtered rows after the display order was rebuilt."""
+        self._folded = None
+        self._views = []
+        self._update_view()
+
+    def _update_view(self) -> None:
+        """Narrow the display order to the rows the hidden flag and filter allow.
+
+        ``_views`` is a stack of (needle, rows, names), each a subsequence of
+        the one below. With dotfiles hidden its bottom entry is the "" needle:
+        the rows left once they are dropped.
+        """
+        needle = self._needle
+        hiding = not self.show_hidden and self._nhidden
+        if not needle and not hiding:
+            self._view = None
+            self._view_names = []
+            self._views = []
+            return
+        rows, names = self._order, self._folded_names()
+        while self._views:
+            previous, view, view_names = self._views[-1]
+            if previous == needle:
+                self._set_view(view, view_names)
+                return
+            if previous in needle:
+                rows, names = view, view_names
+                break
+            self._views.pop()
+        else:
+            if hiding:
+                rows, names = self._drop_hidden(rows, names)
+                self._views.append(("", rows, names))
+                if not needle:
+                    self._set_view(rows, names)
+                    return
+        hits = list(map(contains, names, repeat(needle)))
+        if False in hits:
+            view, view_names = list(compress(rows, hits)), list(compress(names, hits))
+        else:
+            # Common while the first characters are typed: nothing dropped.
+            view, view_names = list(rows), names[:]
+        self._views.append((needle, view, view_names))
+        self._set_view(view, view_names)
+
+    def _drop_hidden(
+        self, rows: array | list[int], names: list[str]
+    ) -> tuple[list[int], list[str]]:
+        shown = list(map(_SHOWN.__getitem__, map(self._flags.__getitem__, rows)))
+        return list(compress(rows, shown)), list(compress(names, shown))
+
+    def _set_view(self, view: list[int], names: list[str]) -> None:
+        flags = self._flags
+        self._view = view
+        self._view_names = names
+        self._view_ndirs = bisect_left(view, True, key=lambda i: not flags[i] & _IS_DIR)
+
+    def _folded_names(self) -> list[str]:
+        """Lower-cased names in display order, built on first use."""
+        if self._folded is None:
+            # One decode and one split for the whole arena; names can't
+            # contain the "/" that terminates each of them.
+            text = bytes(self._arena).decode(_FS_ENCODING, _FS_ERRORS)
+            by_index = text.lower().split("/")
+            self._folded = list(map(by_index.__getitem__, self._order))
+        return self._folded
+
+    # ── Building ────────────────────────────────────────────────
+
+    def _name(self, i: int) -> str:
+        raw = self._arena[self._offsets[i]:self._offsets[i + 1] - 1]
+        return raw.decode(_FS_ENCODING, _FS_ERRORS)
+
+    def _append_entry(self, entry: os.DirEntry[bytes]) -> None:
+        is_symlink = False
+        try:
+            is_symlink = entry.is_symlink()
+            st = entry.stat()
+        except OSError as e:
+            # A dangling symlink still shows as one, like the other scans.
+            self._append(entry.name, None, is_symlink, e)
+        else:
+            self._append(entry.name, st, is_symlink)
+
+    def _append_pending(self, entry: os.DirEntry[bytes]) -> None:
+        """Add an entry from what scandir already knows, leaving stat for later."""
+        flags = _PENDING | (_IS_HIDDEN if entry.name.startswith(b".") else 0)
+        try:
+            # Answered from the directory's own d_type on most filesystems.
+            if entry.is_symlink():
+                flags |= _IS_SYMLINK
+            elif entry.is_dir():
+                flags |= _IS_DIR
+        except OSError:
+            pass
+        self._arena += entry.name
+        self._arena += b"/"
+        self._offsets.append(len(self._arena))
+        self._flags.append(flags)
+        self._sizes.append(0)
+        self._mtimes.append(0.0)
+        self._modes.append(0)
+        self._inodes.append(entry.inode())
+        self._devs.append(0)
+        self._uids.append(0)
+        self._gids.append(0)
+
+    def _append(
+        self,
+        name: bytes,
+        st: os.stat_result | None,
+        is_symlink: bool,
+        error: OSError | None = None,
+    ) -> int:
+        i = len(self._flags)
+        hidden = _IS_HIDDEN if name.startswith(b".") else 0
+        self._arena += name
+        self._arena += b"/"
+        self._offsets.append(len(self._arena))
+        if st is None:
+            self._errors[i] = error.strerror or str(error)
+            self._flags.append(hidden | _HAS_ERROR | (_IS_SYMLINK if is_symlink else 0))
+            self._sizes.append(0)
+            self._mtimes.append(0.0)
+            self._modes.append(0)
+            self._inodes.append(0)
+            self._devs.append(0)
+            self._uids.append(0)
+            self._gids.append(0)
+            return i
+        flags = hidden | (_IS_SYMLINK if is_symlink else 0)
+        if stat.S_ISDIR(st.st_mode):
+            flags |= _IS_DIR
+        self._flags.append(flags)
+        self._sizes.append(0 if flags & _IS_DIR else st.st_size)
+        self._mtimes.append(st.st_mtime)
+        self._modes.append(st.st_mode)
+        self._inodes.append(st.st_ino)
+        self._devs.append(st.st_dev)
+        self._uids.append(st.st_uid)
+        self._gids.append(st.st_gid)
+        return i
+
+    def _store(
+        self,
+        i: int,
+        st: os.stat_result | Statx | None,
+        is_symlink: bool,
+        error: OSError | None = None,
+    ) -> None:
+        """Overwrite entry *i* in place with fresh stat fields."""
+        flags = (self._flags[i] & _IS_HIDDEN) | (_IS_SYMLINK if is_symlink else 0)
+        if st is None:
+            self._errors[i] = error.strerror or str(error)
+            self._flags[i] = flags | _HAS_ERROR
+            st = os.stat_result((0,) * 10)
+        else:
+            self._errors.pop(i, None)
+            if stat.S_ISDIR(st.st_mode):
+                flags |= _IS_DIR
+            self._flags[i] = flags
+        self._sizes[i] = 0 if flags & _IS_DIR else st.st_size
+        self._mtimes[i] = st.st_mtime
+        self._modes[i] = st.st_mode
+        self._inodes[i] = st.st_ino
+        self._devs[i] = st.st_dev
+        self._uids[i] = st.st_uid
+        self._gids[i] = st.st_gid
+
+    def _signature(self, i: int) -> tuple[int, int, float, int, int]:
+        return (
+            self._flags[i], self._sizes[i], self._mtimes[i],
+            self._modes[i], self._inodes[i],
+        )
+
+    def _sort(self) -> None:
+        """Rebuild the name index and the display order from scratch."""
+        flags = self._flags
+        dirs = [i for i in range(len(flags)) if flags[i] & _IS_DIR]
+        files = [i for i in range(len(flags)) if not flags[i] & _IS_DIR]
+        def key(i: int) -> tuple[str, str]:
+            name = self._name(i)
+            return (name.lower(), name)
+
+        dirs.sort(key=key)
+        files.sort(key=key)
+        self._by_name = array("I", dirs)
+        self._by_name.extend(files)
+        self._ndirs = len(dirs)
+        self._nhidden = len(flags) - sum(map(_SHOWN.__getitem__, flags))
+        self._order = self._ordered()
+        self._refilter()
+
+    def copy(self) -> DirectoryListing:
+        """Independent copy of the snapshot, safe to hand to another thread.
+
+        The copy shows every entry: it has no filter and dotfiles are shown.
+        """
+        copy = DirectoryListing(self.path)
+        copy.sort_mode = self.sort_mode
+        copy.reverse = self.reverse
+        copy._arena = self._arena[:]
+        copy._offsets = self._offsets[:]
+        copy._sizes = self._sizes[:]
+        copy._mtimes = self._mtimes[:]
+        copy._modes = self._modes[:]
+        copy._inodes = self._inodes[:]
+        copy._devs = self._devs[:]
+        copy._uids = self._uids[:]
+        copy._gids = self._gids[:]
+        copy._flags = self._flags[:]
+        copy._errors = dict(self._errors)
+        copy._by_name = self._by_name[:]
+        copy._order = self._order[:]
+        copy._ndirs = self._ndirs
+        copy._nhidden = self._nhidden
+        copy._derived = {mode: keys[:] for mode, keys in self._derived.items()}
+        return copy
+
+
+def diff_listings(old: DirectoryListing, new: DirectoryListing) -> list[str]:
+    """Names that were added, removed or changed between two snapshots."""
+    before = {old._name(i): old._signature(i) for i in old._order}
+    changed = []
+    for i in new._order:
+        name = new._name(i)
+        if before.pop(name, None) != new._signature(i):
+            changed.append(name)
+    changed.extend(before)
+    return changed
+
+
+def _scandir(path: Path) -> Iterator[os.DirEntry[bytes]]:
+    try:
+        with os.scandir(os.fsencode(path)) as it:
+            yield from it
+    except OSError:
+        # Unreadable, or removed since we were asked to list it.
+        return
+
+
+def scan_directory(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> DirectoryListing:
+    """Snapshot a directory into a DirectoryListing.
+
+    Entries are read as bytes straight into the name arena and each one
+    is stat'ed once. Dotfiles are included, so hiding or showing them
+    later never has to go back to the disk. *cancelled* is polled between
+    entries; a cancelled scan returns the entries read so far.
+    """
+    if BATCH_STAT and uring.available():
+        return scan_directory_batched(path, cancelled)
+    return _scan_directory_serial(path, cancelled)
+
+
+def _scan_directory_serial(
+    path: Path,
+    cancelled: Callable[[], bool],
+) -> DirectoryListing:
+    listing = DirectoryListing(path)
+    for entry in _scandir(path):
+        if cancelled():
+            break
+        listing._append_entry(entry)
+    listing._sort()
+    return listing
+
+
+def scan_directory_batches(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[DirectoryListing]:
+    """Yield progressively larger sorted snapshots of a directory.
+
+    The first snapshot holds FIRST_BATCH entries and each later one
+    doubles, so re-sorting costs about twice a single sort overall. The
+    last snapshot yielded is the complete listing. *cancelled* is polled
+    between entries and stops the scan early when it returns True.
+    """
+    listing = DirectoryListing(path)
+    target = FIRST_BATCH
+    for entry in _scandir(path):
+        if cancelled():
+            return
+        listing._append_entry(entry)
+        if len(listing._flags) >= target:
+            snapshot = listing.copy()
+            snapshot._sort()
+            yield snapshot
+            target *= 2
+    listing._sort()
+    yield listing
+
+
+def list_names(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> DirectoryListing:
+    """Snapshot a directory's names without stat'ing any entry.
+
+    Directories are told apart by the type scandir reports, so the
+    listing can be shown and browsed straight away; every entry is
+    pending until :meth:`DirectoryListing.fill` stores its metadata.
+    """
+    listing = DirectoryListing(path)
+    for entry in _scandir(path):
+        if cancelled():
+            break
+        listing._append_pending(entry)
+    listing._sort()
+    return listing
+
+
+def stat_names(path: Path, names: Iterable[str]) -> DirectoryListing:
+    """A listing of just *names* in *path*, as they are on disk now.
+
+    Names that don't exist are left out. Handed to
+    :meth:`DirectoryListing.adopt`, it lets a known set of changes be
+    stat'ed off the UI thread.
+    """
+    listing = DirectoryListing(path)
+    for name in names:
+        listing.update(name)
+    return listing
+
+
+def list_directories(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> list[str]:
+    """Names of the subdirectories of *path*, in the order listings use.
+
+    Only symlinks are stat'ed: everything else is judged by the type
+    scandir reports, so directories full of files are cheap to walk.
+    """
+    names = []
+    for entry in _scandir(path):
+        if cancelled():
+            break
+        try:
+            if entry.is_dir():
+                names.append(os.fsdecode(entry.name))
+        except OSError:
+            pass
+    names.sort(key=lambda name: (name.lower(), name))
+    return names
+
+
+def scan_directory_parallel(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> DirectoryListing:
+    """Like :func:`scan_directory`, with the stat calls made by :func:`stat_entries`."""
+    listing = list_names(path, cancelled)
+    for results in stat_entries(listing, cancelled):
+        listing.fill(results)
+    return listing
+
+
+def scan_directory_batched(
+    path: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> DirectoryListing:
+    """Like :func:`scan_directory`, with the metadata fetched through io_uring.
+
+    Names are listed first, then stat'ed a ring's worth per system call
+    instead of one call per entry. Falls back to :func:`scan_directory`'s
+    scandir and stat where io_uring isn't available. A cancelled scan
+    returns with the remaining entries still pending.
+    """
+    if not uring.available():
+        return _scan_directory_serial(path, cancelled)
+    listing = list_names(path, cancelled)
+    arena, offsets = bytes(listing._arena), listing._offsets
+    names = [arena[offsets[i]:offsets[i + 1] - 1] for i in range(len(listing._flags))]
+    done = 0
+    try:
+        for results in uring.statx_batch(path, names, LISTING_FIELDS):
+            listing.fill([
+                (i, None, st) if isinstance(st, OSError) else (i, st, None)
+                for i, st in enumerate(results, done)
+            ])
+            done += len(results)
+            if cancelled():
+                break
+    except OSError:
+        # The directory went away, or the ring couldn't be set up.
+        return _scan_directory_serial(path, cancelled)
+    return listing
+
+
+def stat_entries(
+    listing: DirectoryListing,
+    cancelled: Callable[[], bool] = lambda: False,
+    workers: int = STAT_WORKERS,
+    timeout: float = STAT_TIMEOUT,
+) -> Iterator[list[StatResult]]:
+    """Stat the pending entries of *listing* on a bounded set of threads.
+
+    Yields (entry, stat, error) batches as calls complete, FIRST_BATCH
+    results first and doubling after that, so the caller re-sorts about
+    as often as scan_directory_batches does. On slow network mounts the
+    calls overlap instead of queueing behind one another, and each asks
+    only for LISTING_FIELDS without forcing a sync with the server.
+
+    A call still running after *timeout* is given up on and its entry
+    reported with a TimeoutError; a spare thread takes over its share of
+    the work, up to *workers* spares. The threads are daemons, so a mount
+    that stops answering can't keep the application from exiting.
+    """
+    flags = listing._flags
+    pending = [i for i in range(len(flags)) if flags[i] & _PENDING]
+    if not pending:
+        return
+    base = os.fsencode(listing.path) + b"/"
+    arena, offsets = bytes(listing._arena), listing._offsets
+    paths = {i: base + arena[offsets[i]:offsets[i + 1] - 1] for i in pending}
+    todo: queue.SimpleQueue[int] = queue.SimpleQueue()
+    for i in pending:
+        todo.put(i)
+    done: queue.SimpleQueue[StatResult] = queue.SimpleQueue()
+    running: dict[int, float] = {}
+
+    def work() -> None:
+        while not cancelled():
+            try:
+                i = todo.get_nowait()
+            except queue.Empty:
+                return
+            running[i] = time.monotonic()
+            try:
+                done.put((i, statx(paths[i], LISTING_FIELDS, dont_sync=True), None))
+            except OSError as e:
+                done.put((i, None, e))
+            running.pop(i, None)
+
+    def start() -> None:
+        threading.Thread(target=work, name="stat", daemon=True).start()
+
+    threads = min(workers, len(pending))
+    for _ in range(threads):
+        start()
+    spares, stuck = workers, 0
+    remaining = set(pending)
+    batch: list[StatResult] = []
+    target = FIRST_BATCH
+    while remaining:
+        if cancelled():
+            return
+        try:
+            result = done.get(timeout=0.05)
+        except queue.Empty:
+            result = None
+        if result is not None and result[0] in remaining:
+            remaining.discard(result[0])
+            batch.append(result)
+        deadline = time.monotonic() - timeout
+        for i, began in list(running.items()):
+            if began < deadline and i in remaining:
+                remaining.discard(i)
+                batch.append((i, None, TimeoutError(f"stat took over {timeout:g}s")))
+                stuck += 1
+                if spares:
+                    spares -= 1
+                    threads += 1
+                    start()
+                elif stuck >= threads:
+                    # Every thread is stuck: give up on the rest as well.
+                    batch.extend(
+                        (j, None, TimeoutError("filesystem not responding"))
+                        for j in remaining
+                    )
+                    remaining.clear()
+        if len(batch) >= target or (batch and not remaining):
+            yield batch
+            batch = []
+            target *= 2
@@ -0,0 +1,84 @@
+"""Which filesystem a path lives on, and whether stat calls on it are slow."""
+
+from __future__ import annotations
+
+import re
+import time
+from pathlib import Path
+
+MOUNTINFO = Path("/proc/self/mountinfo")
+
+# How long a parsed mount table is trusted before it is read again (seconds).
+MOUNTS_TTL = 5.0
+
+# A directory whose own stat takes longer than this is treated as being on
+# a slow filesystem even if its type isn't a known network one (seconds).
+SLOW_STAT = 0.005
+
+NETWORK_FILESYSTEMS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p",
+    "ceph", "glusterfs", "lustre", "gpfs", "beegfs", "davfs",
+    "fuse.sshfs", "fuse.rclone", "fuse.s3fs", "fuse.gcsfuse",
+    "fuse.davfs2", "fuse.glusterfs", "fuse.cephfs", "fuse.juicefs",
+})
+
+_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+_mounts: list[tuple[str, str]] = []
+_loaded_at = float("-inf")
+
+
+def filesystem_type(path: Path) -> str | None:
+    """Type of the filesystem *path* is on ("ext4", "nfs4", ...), or None.
+
+    Read from /proc/self/mountinfo, so None on systems without it.
+    """
+    target = str(path)
+    for mount_point, fstype in _mount_table():
+        if (
+            target == mount_point
+            or mount_point == "/"
+            or target.startswith(mount_point + "/")
+        ):
+            return fstype
+    return None
+
+
+def is_network_filesystem(path: Path) -> bool:
+    return filesystem_type(path) in NETWORK_FILESYSTEMS
+
+
+def is_slow(path: Path, stat_seconds: float = 0.0) -> bool:
+    """Whether per-entry stat calls under *path* are worth running in parallel.
+
+    *stat_seconds* is how long a stat of the directory itself just took;
+    it catches slow mounts whose type isn't in NETWORK_FILESYSTEMS.
+    """
+    return stat_seconds > SLOW_STAT or is_network_filesystem(path)
+
+
+def _mount_table() -> list[tuple[str, str]]:
+    """(mount point, fstype) pairs, most specific mount point first."""
+    global _mounts, _loaded_at
+    now = time.monotonic()
+    if now - _loaded_at < MOUNTS_TTL:
+        return _mounts
+    mounts = []
+    try:
+        text = MOUNTINFO.read_text()
+    except OSError:
+        text = ""
+    for line in text.splitlines():
+        # "36 35 98:0 /mnt1 /mnt/parent rw,noatime master:1 - ext3 /dev/root rw"
+        fields, _, rest = line.partition(" - ")
+        fields, rest = fields.split(), rest.split()
+        if len(fields) < 5 or not rest:
+            continue
+        mount_point = _ESCAPE.sub(lambda m: chr(int(m[1], 8)), fields[4])
+        mounts.append((mount_point.rstrip("/") or "/", rest[0]))
+    # Later lines are mounted on top of earlier ones at the same point, so
+    # a stable sort of the reversed table puts the visible mount first.
+    mounts.reverse()
+    mounts.sort(key=lambda mount: len(mount[0]), reverse=True)
+    _mounts, _loaded_at = mounts, now
+    return mounts
@@ -0,0 +1,454 @@
+"""Persistent index of file names under the home directory, for instant search.
+
+Every name under the root is kept in SQLite, along with the name
+lower-cased the way the walk compares it and an FTS5 trigram index on
+that, so a substring query is an index lookup instead of a walk. The
+index is built once on a background thread and saved, then kept current
+by re-listing only the directories whose mtime has moved: all of them
+every :data:`REVALIDATE_INTERVAL` seconds, and at once for directories
+inotify reports or a caller passes to :meth:`NameIndex.invalidate`.
+
+It covers what a default search sees — no hidden entries and nothing
+below :data:`~shellguide.core.search.EXCLUDED_DIRS` — so searches with
+hidden files shown, or outside the root, still walk.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import closing
+from pathlib import Path
+
+from shellguide.core.search import EXCLUDED_DIRS
+from shellguide.core.watcher import Changes, DirectoryWatcher
+
+INDEX_PATH = Path.home() / ".shellguide" / "index.sqlite3"
+
+# How often every indexed directory is re-stat'ed for changes (seconds).
+REVALIDATE_INTERVAL = 120.0
+
+# Directories watched with inotify, shallowest first. The rest are only
+# caught by revalidation, so a large tree doesn't use up the user's
+# inotify watches.
+MAX_WATCHES = 1024
+
+# Directories listed per transaction while building.
+_BATCH = 500
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE dirs (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, mtime_ns INTEGER NOT NULL);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    dir INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    folded TEXT NOT NULL,
+    is_dir INTEGER NOT NULL
+);
+CREATE INDEX entries_dir ON entries (dir);
+CREATE VIRTUAL TABLE names USING fts5 (
+    folded, content='entries', content_rowid='id', tokenize='trigram case_sensitive 1'
+);
+"""
+
+# Keep the trigram index in step with entries. A full build drops them
+# and indexes every name in one pass at the end, which is several times
+# faster than row by row.
+_TRIGGERS = """
+CREATE TRIGGER entries_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO names (rowid, folded) VALUES (new.id, new.folded);
+END;
+CREATE TRIGGER entries_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO names (names, rowid, folded) VALUES ('delete', old.id, old.folded);
+END;
+"""
+
+
+def _storable(name: str) -> bool:
+    # Names that aren't valid UTF-8 decode to lone surrogates, which
+    # SQLite can't store.
+    try:
+        name.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _subtree(path: str) -> tuple[str, str, str]:
+    """Bounds matching *path* and every path below it: ``= a OR (> b AND < c)``."""
+    # "0" sorts right after "/", so the range holds exactly "path/...".
+    prefix = path.rstrip("/") + "/"
+    return path, prefix, prefix[:-1] + "0"
+
+
+class NameIndex:
+    """A saved, self-updating index of the names under *root*.
+
+    :meth:`start` opens (or builds) it on a background thread; until the
+    first build has finished :meth:`covers` is False and callers walk as
+    before. Queries open their own read-only connection, so they run on
+    any thread alongside the updater.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        path: Path = INDEX_PATH,
+        revalidate_interval: float = REVALIDATE_INTERVAL,
+    ) -> None:
+        self.root = root if root is not None else Path.home()
+        self.path = path
+        self._revalidate_interval = revalidate_interval
+        self._ready = False
+        # Set from start() until _run has finished, even after stop().
+        self._thread: threading.Thread | None = None
+        self._restart = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._dirty: set[str] = set()
+        self._watcher: DirectoryWatcher | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a complete index is available to query."""
+        return self._ready
+
+    # ── Lifecycle ───────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Load or build the index in the background. Does nothing if running.
+
+        After a :meth:`stop` whose thread is still winding down, a new one
+        takes over once it has finished, so only one ever writes.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._launch()
+            elif self._stop.is_set():
+                self._restart = True
+
+    def stop(self) -> None:
+        """Stop updating, without waiting for the thread to wind down.
+
+        Work so far is saved; the next start carries on.
+        """
+        with self._lock:
+            self._restart = False
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._ready = False
+        self._wake.set()
+
+    def invalidate(self, directories: Iterable[Path]) -> None:
+        """Re-list *directories* soon, if they are indexed. Safe from any thread."""
+        with self._lock:
+            self._dirty.update(map(str, directories))
+        self._wake.set()
+
+    # ── Queries ─────────────────────────────────────────────────
+
+    def covers(self, root: Path, show_hidden: bool = False) -> bool:
+        """Whether a search under *root* can be answered from the index.
+
+        True once the index is ready, for a directory it holds — inside
+        the index root and not hidden or excluded — when hidden files
+        aren't wanted.
+        """
+        if show_hidden or not self._ready:
+            return False
+        try:
+            with closing(self._connect()) as db:
+                row = db.execute("SELECT 1 FROM dirs WHERE path = ?", (str(root),)).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def search(self, root: Path, query: str) -> Iterator[str]:
+        """Yield the indexed paths under *root* whose names contain *query*.
+
+        Case-insensitive, like the walk: both compare str.lower() forms,
+        which SQLite's own case folding only matches for ASCII. Paths that
+        have gone since the index last saw them are skipped.
+        """
+        needle = query.lower()
+        if len(needle) >= 3:
+            # A quoted phrase of trigrams is a substring match, answered
+            # from the index.
+            source = "names JOIN entries ON entries.id = names.rowid"
+            match = "names MATCH ?"
+            pattern = '"' + needle.replace('"', '""') + '"'
+        else:
+            # Too short for a trigram: scan the names.
+            source = "entries"
+            match = "instr(entries.folded, ?) > 0"
+            pattern = needle
+        db = self._connect()
+        try:
+            rows = db.execute(
+                f"SELECT dirs.path, entries.name FROM {source}"
+                " JOIN dirs ON dirs.id = entries.dir"
+                f" WHERE {match} AND (dirs.path = ? OR (dirs.path > ? AND dirs.path < ?))",
+                (pattern, *_subtree(str(root))),
+            )
+            for directory, name in rows:
+                path = os.path.join(directory, name)
+                if os.path.lexists(path):
+                    yield path
+        finally:
+            db.close()
+
+    def paths(self, root: Path) -> Iterator[str]:
+        """Yield every indexed path under *root*, *root* itself excluded."""
+        db = self._connect()
+        try:
+            # A row per directory, not per name: no name contains "/".
+            rows = db.execute(
+                "SELECT path, (SELECT group_concat(name, '/') FROM entries WHERE dir = dirs.id)"
+                " FROM dirs WHERE path = ? OR (path > ? AND path < ?)",
+                _subtree(str(root)),
+            )
+            for directory, names in rows:
+                if names is None:
+                    continue
+                prefix = os.path.join(directory, "")
+                for name in names.split("/"):
+                    yield prefix + name
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    # ── Updating ────────────────────────────────────────────────
+
+    def _launch(self) -> None:
+        # Called with the lock held.
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shellguide-index", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._maintain()
+        finally:
+            with self._lock:
+                self._ready = False
+                self._thread = None
+                if self._restart:
+                    self._restart = False
+                    self._launch()
+
+    def _maintain(self) -> None:
+        try:
+            db = self._open()
+        except (OSError, sqlite3.Error):
+            # No FTS5 in this SQLite, or nowhere to keep the file.
+            return
+        try:
+            fresh = db.execute(
+                "SELECT value FROM meta WHERE key = 'root'"
+            ).fetchone() != (str(self.root),)
+            if fresh:
+                self._build(db)
+                if self._stop.is_set():
+                    return
+            self._ready = True
+            self._start_watcher(db)
+            # A saved index may be days old: check it over straight away.
+            next_sweep = time.monotonic() + (self._revalidate_interval if fresh else 0.0)
+            while not self._stop.is_set():
+                self._wake.wait(max(0.0, next_sweep - time.monotonic()))
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                with self._lock:
+                    dirty, self._dirty = self._dirty, set()
+                stale = list(dirty)
+                if time.monotonic() >= next_sweep:
+                    stale.extend(self._stale_directories(db))
+                    next_sweep = time.monotonic() + self._revalidate_interval
+                if stale:
+                    self._refresh(db, stale)
+                    self._update_watches(db)
+        finally:
+            if self._watcher is not None:
+                self._watcher.stop()
+                self._watcher = None
+            db.close()
+
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                # New, or written by another version: start over.
+                db.executescript(
+                    "DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS names;"
+                    " DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS dirs;"
+                    + _SCHEMA
+                    + _TRIGGERS
+                    + f"PRAGMA user_version = {_SCHEMA_VERSION};"
+                )
+        except BaseException:
+            db.close()
+            raise
+        return db
+
+    def _build(self, db: sqlite3.Connection) -> None:
+        """Index the whole root from scratch, committing as it goes."""
+        db.executescript(
+            "DROP TRIGGER IF EXISTS entries_insert; DROP TRIGGER IF EXISTS entries_delete;"
+            "DELETE FROM meta; DELETE FROM entries; DELETE FROM dirs;"
+            "INSERT INTO names (names) VALUES ('delete-all');"
+        )
+        self._descend(db, [str(self.root)])
+        if not self._stop.is_set():
+            with db:
+                db.execute("INSERT INTO names (names) VALUES ('rebuild')")
+            db.executescript(_TRIGGERS)
+            # Only now is it complete; a build cut short starts over.
+            with db:
+                db.execute("INSERT INTO meta VALUES ('root', ?)", (str(self.root),))
+
+    def _descend(self, db: sqlite3.Connection, paths: Iterable[str]) -> None:
+        """List *paths* and every directory below them, breadth first."""
+        todo = deque(paths)
+        while todo and not self._stop.is_set():
+            with db:
+                for _ in range(min(_BATCH, len(todo))):
+                    todo.extend(self._list(db, todo.popleft())[1])
+
+    def _refresh(self, db: sqlite3.Connection, paths: list[str]) -> None:
+        """Re-list *paths*, dropping subdirectories that went and indexing new ones."""
+        new: list[str] = []
+        # Parents first, so a subtree removed with its parent isn't re-listed.
+        for path in sorted(paths):
+            if self._stop.is_set():
+                return
+            if not self._indexed(db, path):
+                continue
+            with db:
+                before = {
+                    name for (name,) in db.execute(
+                        "SELECT entries.name FROM entries JOIN dirs ON dirs.id = entries.dir"
+                        " WHERE dirs.path = ? AND entries.is_dir",
+                        (path,),
+                    )
+                }
+                listed, subdirs = self._list(db, path)
+                if not listed:
+                    self._forget(db, path)
+                    continue
+                after = {os.path.basename(subdir) for subdir in subdirs}
+                for name in before - after:
+                    self._forget(db, os.path.join(path, name))
+                new.extend(os.path.join(path, name) for name in after - before)
+        self._descend(db, new)
+
+    def _list(self, db: sqlite3.Connection, path: str) -> tuple[bool, list[str]]:
+        """Replace *path*'s entries with what is on disk now.
+
+        Returns whether it could be read and the subdirectories to index.
+        """
+        rows: list[tuple[str, bool]] = []
+        subdirs: list[str] = []
+        try:
+            # Stat'ed before listing: a change during the listing leaves
+            # the saved mtime behind, so the next sweep lists it again.
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith(".") or not _storable(name):
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    rows.append((name, is_dir))
+                    if is_dir and name not in EXCLUDED_DIRS:
+                        subdirs.append(entry.path)
+        except OSError:
+            return False, []
+        row = db.execute("SELECT id FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            dir_id = db.execute(
+                "INSERT INTO dirs (path, mtime_ns) VALUES (?, ?)", (path, mtime_ns)
+            ).lastrowid
+        else:
+            dir_id = row[0]
+            db.execute("UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id))
+            db.execute("DELETE FROM entries WHERE dir = ?", (dir_id,))
+        db.executemany(
+            "INSERT INTO entries (dir, name, folded, is_dir) VALUES (?, ?, ?, ?)",
+            [(dir_id, name, name.lower(), is_dir) for name, is_dir in rows],
+        )
+        return True, subdirs
+
+    def _forget(self, db: sqlite3.Connection, path: str) -> None:
+        """Drop *path* and everything indexed below it."""
+        where = "path = ? OR (path > ? AND path < ?)"
+        db.execute(
+            f"DELETE FROM entries WHERE dir IN (SELECT id FROM dirs WHERE {where})",
+            _subtree(path),
+        )
+        db.execute(f"DELETE FROM dirs WHERE {where}", _subtree(path))
+
+    @staticmethod
+    def _indexed(db: sqlite3.Connection, path: str) -> bool:
+        return db.execute("SELECT 1 FROM dirs WHERE path = ?", (path,)).fetchone() is not None
+
+    def _stale_directories(self, db: sqlite3.Connection) -> list[str]:
+        """Indexed directories whose mtime differs from the one saved."""
+        stale = []
+        for i, (path, mtime_ns) in enumerate(
+            db.execute("SELECT path, mtime_ns FROM dirs").fetchall()
+        ):
+            if i % 1000 == 0:
+                if self._stop.is_set():
+                    break
+                # Let the UI thread have the GIL between chunks.
+                time.sleep(0)
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime_ns:
+                stale.append(path)
+        return stale
+
+    def _start_watcher(self, db: sqlite3.Connection) -> None:
+        watcher = DirectoryWatcher(self._on_changes, delay=0.5, max_latency=2.0)
+        if not watcher.uses_inotify:
+            # Polling would stat every watched directory each second;
+            # revalidation already covers that.
+            watcher.stop()
+            return
+        self._watcher = watcher
+        self._update_watches(db)
+        watcher.start()
+
+    def _update_watches(self, db: sqlite3.Connection) -> None:
+        if self._watcher is not None:
+            self._watcher.set_paths(
+                Path(path) for (path,) in db.execute(
+                    "SELECT path FROM dirs ORDER BY length(path) LIMIT ?", (MAX_WATCHES,)
+                )
+            )
+
+    def _on_changes(self, changes: Changes) -> None:
+        self.invalidate(changes)
+
+
+name_index = NameIndex()
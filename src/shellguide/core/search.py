@@ -0,0 +1,256 @@
+"""Recursive file name search, one-off or incremental."""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections.abc import Callable, Collection, Iterator
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from shellguide.core.file_utils import FileInfo
+from shellguide.core.fs_cache import listing_cache
+
+if TYPE_CHECKING:
+    from shellguide.core.name_index import NameIndex
+
+# Threads walking the tree. They overlap readdir calls that wait on the
+# disk; more than a few fight the UI thread for the GIL on a warm cache.
+SEARCH_WORKERS = 4
+
+EXCLUDED_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__",
+    ".venv", "venv", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+})
+"""Directories that are never descended into: VCS metadata, installed
+dependencies and tool caches. A name match on one is still reported."""
+
+
+def iter_search(
+    root: Path,
+    query: str,
+    show_hidden: bool = False,
+    exclude: Collection[str] = EXCLUDED_DIRS,
+    cancelled: Callable[[], bool] = lambda: False,
+    workers: int = SEARCH_WORKERS,
+) -> Iterator[FileInfo]:
+    """Yield the entries under *root* whose names contain *query*, as they are found.
+
+    A FileInfo for each path :func:`iter_matches` finds, so only the
+    matches are stat'ed.
+    """
+    with closing(iter_matches(root, query, show_hidden, exclude, cancelled, workers)) as paths:
+        for path in paths:
+            yield FileInfo(Path(path))
+
+
+def iter_matches(
+    root: Path,
+    query: str,
+    show_hidden: bool = False,
+    exclude: Collection[str] = EXCLUDED_DIRS,
+    cancelled: Callable[[], bool] = lambda: False,
+    workers: int = SEARCH_WORKERS,
+) -> Iterator[str]:
+    """Yield the paths under *root* whose names contain *query*, as they are found.
+
+    Subdirectories are handed out to a pool of threads, so results from
+    shallow directories tend to come first but the order isn't fixed.
+    Hidden and *exclude*d directories are pruned before they are read,
+    symlinked directories aren't followed, and nothing is stat'ed.
+    Directories in the listing cache are searched from memory. The walk
+    stops when *cancelled* returns True or the generator is closed.
+    """
+    needle = query.lower()
+    todo: queue.SimpleQueue[Path | None] = queue.SimpleQueue()
+    found: queue.SimpleQueue[list[str] | None] = queue.SimpleQueue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    # Directories queued or being read; the walk is over when it hits 0.
+    outstanding = 1
+
+    def visit(directory: Path) -> tuple[list[str], list[Path]]:
+        matches: list[str] = []
+        subdirs: list[Path] = []
+        listing = listing_cache.get(directory)
+        if listing is not None:
+            for row in range(len(listing)):
+                if not show_hidden and listing.is_hidden(row):
+                    continue
+                name = listing.name(row)
+                if needle in name.lower():
+                    matches.append(os.path.join(directory, name))
+                if listing.is_dir(row) and not listing.is_symlink(row) and name not in exclude:
+                    subdirs.append(directory / name)
+            return matches, subdirs
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if not show_hidden and name.startswith("."):
+                        continue
+                    if needle in name.lower():
+                        matches.append(entry.path)
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and name not in exclude:
+                            subdirs.append(Path(entry.path))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return matches, subdirs
+
+    def work() -> None:
+        nonlocal outstanding
+        while True:
+            directory = todo.get()
+            if directory is None:
+                return
+            if not stop.is_set():
+                matches, subdirs = visit(directory)
+                if matches:
+                    found.put(matches)
+                with lock:
+                    outstanding += len(subdirs)
+                for subdir in subdirs:
+                    todo.put(subdir)
+            with lock:
+                outstanding -= 1
+                finished = outstanding == 0
+            if finished:
+                for _ in range(workers):
+                    todo.put(None)
+                found.put(None)
+
+    todo.put(root)
+    for _ in range(workers):
+        threading.Thread(target=work, name="search", daemon=True).start()
+    try:
+        while not cancelled():
+            try:
+                batch = found.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if batch is None:
+                return
+            yield from batch
+    finally:
+        # Queued directories are skipped from here on, so the threads
+        # wind down as soon as the ones being read are done.
+        stop.set()
+
+
+class _Walk:
+    """One background walk and every match it has found so far."""
+
+    __slots__ = ("needle", "paths", "names", "done", "stop")
+
+    def __init__(self, needle: str) -> None:
+        self.needle = needle
+        self.paths: list[str] = []
+        # Lower-cased basenames, so refining a query doesn't redo it.
+        self.names: list[str] = []
+        self.done = False
+        self.stop = threading.Event()
+
+
+class SearchSession:
+    """Searches under one root that reuse each other's work as a query grows.
+
+    The first query starts a walk on a background thread that keeps
+    every match. A later query containing that walk's query — the user
+    typed more — can only match a subset, so it filters the matches in
+    memory and then follows the walk if it is still running. Only a
+    query that doesn't contain it, such as one shortened past it, starts
+    a new walk. A session doesn't notice files created after its walk;
+    make a new one to search afresh.
+
+    Given a :class:`~shellguide.core.name_index.NameIndex` that covers
+    the search, the matches come from the index instead of a walk.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        show_hidden: bool = False,
+        exclude: Collection[str] = EXCLUDED_DIRS,
+        index: NameIndex | None = None,
+    ) -> None:
+        self.root = root
+        self.show_hidden = show_hidden
+        self.exclude = exclude
+        self.index = index
+        self._walk: _Walk | None = None
+        self._changed = threading.Condition()
+
+    def refines(self, query: str) -> bool:
+        """Whether *query* can be answered from the current walk's matches."""
+        walk = self._walk
+        return walk is not None and walk.needle in query.lower()
+
+    def search(self, query: str, cancelled: Callable[[], bool] = lambda: False) -> Iterator[str]:
+        """Yield the paths whose names contain *query*, as they are found.
+
+        Several searches may run at once, from different threads; a
+        superseded one just stops when *cancelled* returns True.
+        """
+        needle = query.lower()
+        with self._changed:
+            walk = self._walk
+            if not self.refines(needle):
+                if walk is not None:
+                    walk.stop.set()
+                walk = self._walk = self._start(needle)
+        seen = 0
+        while not cancelled():
+            with self._changed:
+                while seen == len(walk.paths) and not walk.done and not cancelled():
+                    self._changed.wait(0.05)
+                end, done = len(walk.paths), walk.done
+            names, paths = walk.names, walk.paths
+            for i in range(seen, end):
+                if needle in names[i]:
+                    yield paths[i]
+                    if cancelled():
+                        return
+            seen = end
+            if done:
+                return
+
+    def close(self) -> None:
+        """Stop the walk in progress, if any."""
+        with self._changed:
+            if self._walk is not None:
+                self._walk.stop.set()
+                self._walk = None
+
+    def _start(self, needle: str) -> _Walk:
+        walk = _Walk(needle)
+
+        def run() -> None:
+            if (
+                self.index is not None
+                and self.exclude == EXCLUDED_DIRS
+                and self.index.covers(self.root, self.show_hidden)
+            ):
+                matches = self.index.search(self.root, needle)
+            else:
+                matches = iter_matches(
+                    self.root, needle, self.show_hidden, self.exclude, walk.stop.is_set
+                )
+            with closing(matches):
+                for path in matches:
+                    if walk.stop.is_set():
+                        break
+                    with self._changed:
+                        walk.paths.append(path)
+                        walk.names.append(os.path.basename(path).lower())
+                        self._changed.notify_all()
+            with self._changed:
+                walk.done = True
+                self._changed.notify_all()
+
+        threading.Thread(target=run, name="search-session", daemon=True).start()
+        return walk
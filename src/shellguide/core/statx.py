@@ -0,0 +1,215 @@
+"""Linux statx(2) through ctypes, with an os.stat fallback elsewhere.
+
+statx lets a caller name the fields it wants, so a listing on a network
+mount can ask for just type, size and mtime and let the client answer
+from its attribute cache (``AT_STATX_DONT_SYNC``). It also reports birth
+time and mount id, which os.stat can't.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import stat
+import struct
+import sys
+from pathlib import Path
+
+# Field masks (linux/stat.h).
+STATX_TYPE = 0x0001
+STATX_MODE = 0x0002
+STATX_NLINK = 0x0004
+STATX_UID = 0x0008
+STATX_GID = 0x0010
+STATX_ATIME = 0x0020
+STATX_MTIME = 0x0040
+STATX_CTIME = 0x0080
+STATX_INO = 0x0100
+STATX_SIZE = 0x0200
+STATX_BLOCKS = 0x0400
+STATX_BASIC_STATS = 0x07FF
+STATX_BTIME = 0x0800
+STATX_MNT_ID = 0x1000
+
+# Flags.
+AT_FDCWD = -100
+AT_SYMLINK_NOFOLLOW = 0x0100
+AT_STATX_DONT_SYNC = 0x4000
+
+LISTING_FIELDS = STATX_TYPE | STATX_SIZE | STATX_MTIME | STATX_INO
+"""What a file list row shows: whether it is a directory, its size and mtime."""
+
+DETAIL_FIELDS = STATX_BASIC_STATS | STATX_BTIME | STATX_MNT_ID
+"""Everything the info panel shows, including creation time and mount."""
+
+
+# The struct statx fields Statx keeps, at their offsets in the kernel's
+# 256-byte layout: mask, nlink, uid, gid, mode, ino, size, then atime,
+# btime, ctime and mtime as (seconds, nanoseconds), dev and mnt_id.
+_LAYOUT = struct.Struct("<I12xIIIH2xQQ16x" + "qI4x" * 4 + "8xIIQ")
+
+BUFFER_SIZE = 256
+"""Size of struct statx, for callers that hand the kernel their own buffers."""
+
+
+class _Timestamp(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", ctypes.c_int64),
+        ("tv_nsec", ctypes.c_uint32),
+        ("_reserved", ctypes.c_int32),
+    ]
+
+
+class _StatxBuffer(ctypes.Structure):
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _Timestamp),
+        ("stx_btime", _Timestamp),
+        ("stx_ctime", _Timestamp),
+        ("stx_mtime", _Timestamp),
+        ("stx_rdev_major", ctypes.c_uint32),
+        ("stx_rdev_minor", ctypes.c_uint32),
+        ("stx_dev_major", ctypes.c_uint32),
+        ("stx_dev_minor", ctypes.c_uint32),
+        ("stx_mnt_id", ctypes.c_uint64),
+        ("_spare", ctypes.c_uint64 * 13),
+    ]
+
+
+def _load_statx():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        # Not glibc 2.28+ (or musl 1.2.5+).
+        return None
+    func.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_uint,
+        ctypes.POINTER(_StatxBuffer),
+    ]
+    func.restype = ctypes.c_int
+    return func
+
+
+_statx = _load_statx()
+
+
+class Statx:
+    """The result of a statx call.
+
+    Carries the ``st_*`` attributes listing code reads from
+    os.stat_result. Fields outside :attr:`mask` weren't filled in: the
+    numeric ones are 0, and birth time and mount id are None.
+    """
+
+    __slots__ = (
+        "mask",
+        "st_mode",
+        "st_ino",
+        "st_dev",
+        "st_nlink",
+        "st_uid",
+        "st_gid",
+        "st_size",
+        "st_atime",
+        "st_mtime",
+        "st_ctime",
+        "st_birthtime",
+        "mnt_id",
+    )
+
+    @classmethod
+    def _unpack(cls, buf, offset: int = 0) -> Statx:
+        """Decode a struct statx held in *buf* at *offset*."""
+        (
+            mask, nlink, uid, gid, mode, ino, size,
+            atime, atime_ns, btime, btime_ns, ctime, ctime_ns, mtime, mtime_ns,
+            dev_major, dev_minor, mnt_id,
+        ) = _LAYOUT.unpack_from(buf, offset)
+        result = cls()
+        result.mask = mask
+        result.st_mode = mode
+        result.st_ino = ino
+        result.st_dev = os.makedev(dev_major, dev_minor)
+        result.st_nlink = nlink
+        result.st_uid = uid
+        result.st_gid = gid
+        result.st_size = size
+        result.st_atime = atime + atime_ns / 1e9
+        result.st_mtime = mtime + mtime_ns / 1e9
+        result.st_ctime = ctime + ctime_ns / 1e9
+        result.st_birthtime = btime + btime_ns / 1e9 if mask & STATX_BTIME else None
+        result.mnt_id = mnt_id if mask & STATX_MNT_ID else None
+        return result
+
+    @classmethod
+    def _from_stat(cls, st: os.stat_result) -> Statx:
+        result = cls()
+        birth = getattr(st, "st_birthtime", None)
+        result.mask = STATX_BASIC_STATS | (STATX_BTIME if birth is not None else 0)
+        result.st_mode = st.st_mode
+        result.st_ino = st.st_ino
+        result.st_dev = st.st_dev
+        result.st_nlink = st.st_nlink
+        result.st_uid = st.st_uid
+        result.st_gid = st.st_gid
+        result.st_size = st.st_size
+        result.st_atime = st.st_atime
+        result.st_mtime = st.st_mtime
+        result.st_ctime = st.st_ctime
+        result.st_birthtime = birth
+        result.mnt_id = None
+        return result
+
+    @property
+    def is_dir(self) -> bool:
+        return stat.S_ISDIR(self.st_mode)
+
+
+def statx(
+    path: Path | str | bytes,
+    mask: int = STATX_BASIC_STATS,
+    *,
+    follow_symlinks: bool = True,
+    dont_sync: bool = False,
+) -> Statx:
+    """Stat *path*, asking the kernel only for the fields in *mask*.
+
+    With *dont_sync* a network filesystem may answer from its cached
+    attributes instead of asking the server. The kernel can return more
+    fields than were asked for, and fewer when the filesystem doesn't keep
+    them (birth time on many); check ``mask`` on the result. Where statx
+    isn't available this is os.stat, so it works the same on every platform.
+    Raises OSError like os.stat.
+    """
+    global _statx
+    if _statx is not None:
+        flags = 0 if follow_symlinks else AT_SYMLINK_NOFOLLOW
+        if dont_sync:
+            flags |= AT_STATX_DONT_SYNC
+        name = os.fsencode(path)
+        buf = _StatxBuffer()
+        if _statx(AT_FDCWD, name, flags, mask, ctypes.byref(buf)) == 0:
+            return Statx._unpack(buf)
+        err = ctypes.get_errno()
+        if err != errno.ENOSYS:
+            raise OSError(err, os.strerror(err), os.fsdecode(name))
+        # The C library has statx but the kernel (or a seccomp filter) doesn't.
+        _statx = None
+    return Statx._from_stat(os.stat(path, follow_symlinks=follow_symlinks))
@@ -0,0 +1,286 @@
+"""Batched statx through io_uring, for very large directories.
+
+One io_uring_enter call submits a ring's worth of statx requests and
+waits for them all, instead of one system call per entry. The ring is
+set up through raw system calls with ctypes, so there is no liburing
+dependency. Where io_uring isn't usable (not Linux, an older kernel, a
+seccomp filter, or ``kernel.io_uring_disabled``), :func:`available` is
+False and callers stay on scandir and stat.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import mmap
+import os
+import platform
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from shellguide.core.statx import (
+    AT_STATX_DONT_SYNC,
+    AT_SYMLINK_NOFOLLOW,
+    BUFFER_SIZE,
+    LISTING_FIELDS,
+    Statx,
+)
+
+# Submission queue size. Each ring holds this many statx buffers too.
+RING_ENTRIES = 256
+
+# io_uring_setup and io_uring_enter share these numbers on every
+# architecture that has them.
+_SYS_IO_URING_SETUP = 425
+_SYS_IO_URING_ENTER = 426
+
+_IORING_OP_STATX = 21
+_IORING_FEAT_SINGLE_MMAP = 1
+_IORING_ENTER_GETEVENTS = 1
+_IORING_OFF_SQ_RING = 0
+_IORING_OFF_CQ_RING = 0x8000000
+_IORING_OFF_SQES = 0x10000000
+
+# opcode, flags, ioprio, fd, off (the statx buffer), addr (the path),
+# len (the mask), statx flags, user_data; the rest of the 64 bytes zeroed.
+_SQE = struct.Struct("<BBHiQQIIQ24x")
+_CQE = struct.Struct("<QiI")
+_U32 = struct.Struct("<I")
+
+
+class _SqringOffsets(ctypes.Structure):
+    _fields_ = [
+        ("head", ctypes.c_uint32),
+        ("tail", ctypes.c_uint32),
+        ("ring_mask", ctypes.c_uint32),
+        ("ring_entries", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("dropped", ctypes.c_uint32),
+        ("array", ctypes.c_uint32),
+        ("resv1", ctypes.c_uint32),
+        ("user_addr", ctypes.c_uint64),
+    ]
+
+
+class _CqringOffsets(ctypes.Structure):
+    _fields_ = [
+        ("head", ctypes.c_uint32),
+        ("tail", ctypes.c_uint32),
+        ("ring_mask", ctypes.c_uint32),
+        ("ring_entries", ctypes.c_uint32),
+        ("overflow", ctypes.c_uint32),
+        ("cqes", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("resv1", ctypes.c_uint32),
+        ("user_addr", ctypes.c_uint64),
+    ]
+
+
+class _Params(ctypes.Structure):
+    _fields_ = [
+        ("sq_entries", ctypes.c_uint32),
+        ("cq_entries", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("sq_thread_cpu", ctypes.c_uint32),
+        ("sq_thread_idle", ctypes.c_uint32),
+        ("features", ctypes.c_uint32),
+        ("wq_fd", ctypes.c_uint32),
+        ("resv", ctypes.c_uint32 * 3),
+        ("sq_off", _SqringOffsets),
+        ("cq_off", _CqringOffsets),
+    ]
+
+
+def _load_syscall():
+    if not sys.platform.startswith("linux"):
+        return None
+    # Older architectures number their system calls differently.
+    if platform.machine() not in ("x86_64", "aarch64", "riscv64", "ppc64le", "s390x"):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).syscall
+    except (OSError, AttributeError):
+        return None
+    func.restype = ctypes.c_long
+    return func
+
+
+_syscall = _load_syscall()
+_usable: bool | None = None
+
+
+def _enter(fd: int, to_submit: int, min_complete: int) -> int:
+    return _syscall(
+        ctypes.c_long(_SYS_IO_URING_ENTER), ctypes.c_long(fd),
+        ctypes.c_long(to_submit), ctypes.c_long(min_complete),
+        ctypes.c_long(_IORING_ENTER_GETEVENTS), None, ctypes.c_long(0),
+    )
+
+
+class StatxRing:
+    """An io_uring instance that only ever runs statx.
+
+    Not thread-safe. Setting one up costs a few system calls, so
+    :func:`statx_batch` makes one per directory.
+    """
+
+    def __init__(self, entries: int = RING_ENTRIES) -> None:
+        if _syscall is None:
+            raise OSError(errno.ENOSYS, "io_uring is not available")
+        params = _Params()
+        fd = _syscall(
+            ctypes.c_long(_SYS_IO_URING_SETUP), ctypes.c_long(entries), ctypes.byref(params)
+        )
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        try:
+            self._map(params)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.entries = params.sq_entries
+        self._buffers = ctypes.create_string_buffer(self.entries * BUFFER_SIZE)
+        self._buffers_addr = ctypes.addressof(self._buffers)
+
+    def _map(self, params: _Params) -> None:
+        sq_off, cq_off = params.sq_off, params.cq_off
+        sq_size = sq_off.array + params.sq_entries * 4
+        cq_size = cq_off.cqes + params.cq_entries * _CQE.size
+        single = params.features & _IORING_FEAT_SINGLE_MMAP
+        if single:
+            sq_size = cq_size = max(sq_size, cq_size)
+        prot = mmap.PROT_READ | mmap.PROT_WRITE
+        self._sq = mmap.mmap(self._fd, sq_size, mmap.MAP_SHARED, prot, offset=_IORING_OFF_SQ_RING)
+        self._cq = self._sq if single else mmap.mmap(
+            self._fd, cq_size, mmap.MAP_SHARED, prot, offset=_IORING_OFF_CQ_RING
+        )
+        self._sqes = mmap.mmap(
+            self._fd, params.sq_entries * _SQE.size, mmap.MAP_SHARED, prot,
+            offset=_IORING_OFF_SQES,
+        )
+        self._sq_tail = sq_off.tail
+        self._sq_mask = _U32.unpack_from(self._sq, sq_off.ring_mask)[0]
+        self._sq_array = sq_off.array
+        self._cq_head = cq_off.head
+        self._cq_tail = cq_off.tail
+        self._cq_mask = _U32.unpack_from(self._cq, cq_off.ring_mask)[0]
+        self._cqes = cq_off.cqes
+        # The kernel sized the rings, so each index maps to itself once.
+        for i in range(params.sq_entries):
+            _U32.pack_into(self._sq, self._sq_array + 4 * i, i)
+
+    def __enter__(self) -> StatxRing:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self._sqes.close()
+        if self._cq is not self._sq:
+            self._cq.close()
+        self._sq.close()
+        os.close(self._fd)
+        self._fd = -1
+
+    def statx(
+        self,
+        dirfd: int,
+        names: list[bytes],
+        mask: int = LISTING_FIELDS,
+        flags: int = 0,
+    ) -> list[Statx | OSError]:
+        """statx every name in *names* (at most :attr:`entries`), relative to *dirfd*."""
+        count = len(names)
+        if count > self.entries:
+            raise ValueError(f"at most {self.entries} names per call")
+        # The paths must stay alive, NUL-terminated, until the kernel has
+        # read them; one buffer holds them all.
+        joined = ctypes.create_string_buffer(b"\0".join(names) + b"\0")
+        address = ctypes.addressof(joined)
+        sq, sqes, mask_sq = self._sq, self._sqes, self._sq_mask
+        tail = _U32.unpack_from(sq, self._sq_tail)[0]
+        start = 0
+        for i, name in enumerate(names):
+            # Slots are reused in order, so slot i holds buffer i.
+            slot = (tail + i) & mask_sq
+            _SQE.pack_into(
+                sqes, slot * _SQE.size,
+                _IORING_OP_STATX, 0, 0, dirfd,
+                self._buffers_addr + i * BUFFER_SIZE, address + start,
+                mask, flags, i,
+            )
+            start += len(name) + 1
+        _U32.pack_into(sq, self._sq_tail, (tail + count) & 0xFFFFFFFF)
+        results: list[Statx | OSError | None] = [None] * count
+        submit, waiting = count, count
+        while waiting:
+            done = _enter(self._fd, submit, waiting)
+            if done < 0:
+                err = ctypes.get_errno()
+                if err in (errno.EINTR, errno.EAGAIN, errno.EBUSY):
+                    continue
+                raise OSError(err, os.strerror(err))
+            submit = max(0, submit - done)
+            waiting -= self._reap(results, names)
+        return results
+
+    def _reap(self, results: list, names: list[bytes]) -> int:
+        cq = self._cq
+        head = _U32.unpack_from(cq, self._cq_head)[0]
+        tail = _U32.unpack_from(cq, self._cq_tail)[0]
+        reaped = 0
+        while head != tail:
+            i, res, _ = _CQE.unpack_from(cq, self._cqes + (head & self._cq_mask) * _CQE.size)
+            if res < 0:
+                results[i] = OSError(-res, os.strerror(-res), os.fsdecode(names[i]))
+            else:
+                results[i] = Statx._unpack(self._buffers, i * BUFFER_SIZE)
+            head = (head + 1) & 0xFFFFFFFF
+            reaped += 1
+        _U32.pack_into(cq, self._cq_head, head)
+        return reaped
+
+
+def available() -> bool:
+    """Whether io_uring statx works here. Probed once, on first use."""
+    global _usable
+    if _usable is None:
+        try:
+            for results in statx_batch(Path("/"), [b"."]):
+                _usable = not isinstance(results[0], OSError)
+        except OSError:
+            _usable = False
+    return bool(_usable)
+
+
+def statx_batch(
+    directory: Path,
+    names: list[bytes],
+    mask: int = LISTING_FIELDS,
+    *,
+    follow_symlinks: bool = True,
+    dont_sync: bool = False,
+) -> Iterator[list[Statx | OSError]]:
+    """statx each of *names* in *directory*, a ring's worth per system call.
+
+    Yields one list of results per chunk, in the order of *names*; an
+    entry that couldn't be stat'ed has its OSError in its place. Raises
+    OSError if *directory* can't be opened or the ring can't be set up.
+    """
+    flags = 0 if follow_symlinks else AT_SYMLINK_NOFOLLOW
+    if dont_sync:
+        flags |= AT_STATX_DONT_SYNC
+    dirfd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        with StatxRing() as ring:
+            for start in range(0, len(names), ring.entries):
+                yield ring.statx(dirfd, names[start:start + ring.entries], mask, flags)
+    finally:
+        os.close(dirfd)
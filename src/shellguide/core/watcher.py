@@ -0,0 +1,224 @@
+"""Live directory watching — inotify on Linux, mtime polling elsewhere."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+# inotify event bits (see inotify(7)).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_SELF_EVENTS = IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+# A directory with more distinct changed names than this in one flush is
+# reported as "rescan everything" rather than name by name.
+MAX_NAMES_PER_FLUSH = 512
+
+Changes = dict[Path, "set[str] | None"]
+"""Changed names per directory; ``None`` means the whole directory."""
+
+
+def _load_inotify() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class DirectoryWatcher:
+    """Watches a set of directories and reports coalesced changes.
+
+    Events are gathered until the filesystem has been quiet for *delay*
+    seconds (or *max_latency* has passed since the first one), then handed
+    to *callback* as a single :data:`Changes` mapping from the watcher's
+    own thread. Directories inotify can't watch are polled by mtime every
+    *poll_interval* seconds instead.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Changes], None],
+        delay: float = 0.1,
+        max_latency: float = 0.5,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self._callback = callback
+        self._delay = delay
+        self._max_latency = max_latency
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._wake_r, self._wake_w = os.pipe()
+        self._libc = _load_inotify()
+        self._fd = -1
+        self._wds: dict[int, Path] = {}
+        self._paths: dict[Path, int] = {}
+        self._polled: dict[Path, tuple[int, int]] = {}
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd >= 0
+
+    # ── Watch set ───────────────────────────────────────────────
+
+    def set_paths(self, paths: Iterable[Path]) -> None:
+        """Watch exactly *paths*, adding and dropping watches as needed."""
+        wanted = set(paths)
+        with self._lock:
+            for path in list(self._paths) + list(self._polled):
+                if path not in wanted:
+                    self._unwatch(path)
+            for path in wanted:
+                if path not in self._paths and path not in self._polled:
+                    self._watch(path)
+
+    def _watch(self, path: Path) -> None:
+        if self._fd >= 0:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd >= 0:
+                self._wds[wd] = path
+                self._paths[path] = wd
+                return
+        # No inotify, or out of watches (ENOSPC): fall back to polling.
+        self._polled[path] = _dir_signature(path)
+
+    def _unwatch(self, path: Path) -> None:
+        wd = self._paths.pop(path, None)
+        if wd is not None:
+            self._wds.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._polled.pop(path, None)
+
+    # ── Lifecycle ───────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="shellguide-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        os.write(self._wake_w, b"x")
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _run(self) -> None:
+        pending: Changes = {}
+        first_event = 0.0
+        next_poll = time.monotonic() + self._poll_interval
+        while not self._stop.is_set():
+            now = time.monotonic()
+            timeout = next_poll - now
+            if pending:
+                timeout = min(timeout, self._delay, first_event + self._max_latency - now)
+            watched = [self._wake_r] + ([self._fd] if self._fd >= 0 else [])
+            try:
+                readable, _, _ = select.select(watched, [], [], max(0.0, timeout))
+            except (OSError, ValueError):
+                return
+            if self._stop.is_set():
+                return
+            ready = self._fd in readable
+            if ready:
+                if not pending:
+                    first_event = time.monotonic()
+                self._read_events(pending)
+
+            now = time.monotonic()
+            if now >= next_poll:
+                self._poll(pending)
+                next_poll = now + self._poll_interval
+            if pending and (not ready or now - first_event >= self._max_latency):
+                changes, pending = pending, {}
+                self._callback(changes)
+
+    def _read_events(self, pending: Changes) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except (BlockingIOError, OSError):
+            return
+        offset = 0
+        with self._lock:
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                raw = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    for path in self._paths:
+                        pending[path] = None
+                    continue
+                path = self._wds.get(wd)
+                if path is None or mask & IN_IGNORED:
+                    continue
+                if mask & _SELF_EVENTS or not raw:
+                    pending[path] = None
+                    continue
+                names = pending.setdefault(path, set())
+                if names is not None:
+                    names.add(os.fsdecode(raw))
+                    if len(names) > MAX_NAMES_PER_FLUSH:
+                        pending[path] = None
+
+    def _poll(self, pending: Changes) -> None:
+        with self._lock:
+            for path, signature in self._polled.items():
+                current = _dir_signature(path)
+                if current != signature:
+                    self._polled[path] = current
+                    pending[path] = None
+
+
+def _dir_signature(path: Path) -> tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_ino, st.st_mtime_ns)
@@ -16,6 +16,7 @@ HELP_TEXT = """\
   [bold cyan]Enter[/]       Open directory / file
   [bold cyan]Backspace[/]   Go to parent directory
   [bold cyan]g[/]           Go to home directory
+  [bold cyan][ / ][/]       Back / forward in history
   [bold cyan]Tab[/]         Switch panel focus
 
 [bold]File Operations[/]
@@ -31,8 +32,11 @@ HELP_TEXT = """\
 [bold]View[/]
   [bold cyan]l[/]           Toggle learn mode
   [bold cyan]h[/]           Toggle hidden files
+  [bold cyan]s[/]           Cycle sort (name, natural, size, date, ext)
+  [bold cyan]S[/]           Reverse sort order
   [bold cyan]u[/]           Show disk usage
-  [bold cyan]/[/]           Search files
+  [bold cyan]/[/]           Search files (Ctrl+T: fuzzy paths)
+  [bold cyan]f[/]           Filter this folder (Esc clears)
   [bold cyan]F1[/]          This help screen
 
 [bold cyan]q[/]             Quit ShellGuide
@@ -6,16 +6,16 @@ from pathlib import Path
 
 from textual.app import ComposeResult
 from textual.binding import Binding
-from textual.containers import Horizontal
+from textual.containers import Horizontal, Vertical
 from textual.screen import Screen
-from textual.widgets import DirectoryTree, Footer, Header
+from textual.widgets import DirectoryTree, Footer, Header, Input
 
 from shellguide.core.command_builder import (
     build_cd,
     build_du,
     build_find,
     build_ls,
-    build_stat,
+    build_ls_grep,
 )
 from shellguide.core.file_ops import (
     copy_file,
@@ -27,6 +27,11 @@ from shellguide.core.file_ops import (
     rename,
 )
 from shellguide.core.file_utils import FileInfo, get_disk_usage
+from shellguide.core.fs_cache import listing_cache
+from shellguide.core.history import HistoryEntry, NavigationHistory
+from shellguide.core.listing import SortMode
+from shellguide.core.name_index import name_index
+from shellguide.core.watcher import Changes, DirectoryWatcher
 from shellguide.screens.confirm_dialog import ConfirmDialog
 from shellguide.screens.help_screen import HelpScreen
 from shellguide.screens.input_dialog import InputDialog
@@ -46,10 +51,16 @@ class MainScreen(Screen):
         Binding("q", "quit", "Quit", show=False),
         Binding("f1", "help", "Help", show=True),
         Binding("slash", "search", "Search", show=True),
+        Binding("f", "filter", "Filter", show=False),
+        Binding("escape", "clear_filter", "Clear Filter", show=False),
         Binding("l", "toggle_learn", "Learn Mode", show=True),
         Binding("h", "toggle_hidden", "Hidden Files", show=False),
+        Binding("s", "cycle_sort", "Sort", show=False),
+        Binding("S", "reverse_sort", "Reverse Sort", show=False),
         Binding("backspace", "go_up", "Go Up", show=False),
         Binding("g", "go_home", "Go Home", show=False),
+        Binding("left_square_bracket,alt+left", "go_back", "Back", show=False),
+        Binding("right_square_bracket,alt+right", "go_forward", "Forward", show=False),
         Binding("n", "new_file", "New File", show=False),
         Binding("N", "new_folder", "New Folder", show=False),
         Binding("r", "rename", "Rename", show=False),
@@ -66,49 +77,78 @@ class MainScreen(Screen):
     learn_mode: bool = True
     _clipboard: Path | None = None
     _clipboard_cut: bool = False
+    _watcher: DirectoryWatcher | None = None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._history = NavigationHistory()
 
     def compose(self) -> ComposeResult:
+        # Kept so cursor moves and status updates don't have to query for them.
+        self._table = FileTable(id="file-table")
+        self._info_panel = FileInfoPanel(id="file-info-panel")
+        self._command_log = CommandLog(id="command-log")
+        self._status_bar = StatusBar(id="status-bar")
         yield Header()
         yield Breadcrumb(id="breadcrumb")
         with Horizontal(id="main-container"):
             yield FilteredDirectoryTree(Path.home(), id="directory-tree")
-            yield FileTable(id="file-table")
-            yield FileInfoPanel(id="file-info-panel")
-        yield CommandLog(id="command-log")
-        yield StatusBar(id="status-bar")
+            with Vertical(id="file-table-container"):
+                yield self._table
+                yield Input(placeholder="Filter this folder\u2026", id="filter-input")
+            yield self._info_panel
+        yield self._command_log
+        yield self._status_bar
         yield Footer()
 
     def on_mount(self) -> None:
+        self._watcher = DirectoryWatcher(self._on_filesystem_changes)
+        self._watcher.start()
         self._navigate_to(self.current_path)
         self._update_learn_mode_ui()
         self._update_status()
 
+    def on_unmount(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+        name_index.stop()
+
     # ── Navigation ──────────────────────────────────────────────
 
-    def _navigate_to(self, path: Path) -> None:
-        """Navigate the file table and breadcrumb to a new path."""
+    def _navigate_to(self, path: Path, entry: HistoryEntry | None = None) -> None:
+        """Navigate the file table and breadcrumb to a new path.
+
+        Passing a history *entry* for the path restores its listing and
+        cursor instead of loading it afresh, and isn't recorded as a visit.
+        """
         if not path.is_dir():
             return
+        table = self._table
+        self._close_filter()
+        if entry is not None:
+            table.restore(entry)
+        else:
+            if path != self.current_path:
+                self._history.visit(table.history_entry())
+            table.current_path = path
         self.current_path = path
-        table = self.query_one("#file-table", FileTable)
-        table.current_path = path
         self.query_one("#breadcrumb", Breadcrumb).path = path
 
         if self.learn_mode:
             cmd = build_cd(path)
-            self.query_one("#command-log", CommandLog).log_command(cmd)
-            cmd = build_ls(path, show_hidden=table.show_hidden)
-            self.query_one("#command-log", CommandLog).log_command(cmd)
+            self._command_log.log_command(cmd)
+            cmd = build_ls(path, show_hidden=table.show_hidden, sort_flags=table.sort_flags)
+            self._command_log.log_command(cmd)
 
         self._update_status()
+        self._update_watches()
 
     def on_file_table_file_selected(self, event: FileTable.FileSelected) -> None:
         """Update the info panel when a file is highlighted."""
-        panel = self.query_one("#file-info-panel", FileInfoPanel)
-        panel.update_info(event.file_info)
-        if self.learn_mode:
-            cmd = build_stat(event.file_info.path)
-            # Don't log stat for every highlight — too noisy
+        self._info_panel.update_info(event.file_info)
+        self._update_status()
+
+    def on_file_table_listing_updated(self, event: FileTable.ListingUpdated) -> None:
         self._update_status()
 
     def on_file_table_file_activated(self, event: FileTable.FileActivated) -> None:
@@ -120,9 +160,14 @@ class MainScreen(Screen):
             if self.learn_mode:
                 from shellguide.core.command_builder import build_cat
                 cmd = build_cat(info.path)
-                self.query_one("#command-log", CommandLog).log_command(cmd)
+                self._command_log.log_command(cmd)
             self.notify(f"Selected: {info.name}")
 
+    def on_filtered_directory_tree_expansion_changed(
+        self, event: FilteredDirectoryTree.ExpansionChanged
+    ) -> None:
+        self._update_watches()
+
     def on_directory_tree_directory_selected(
         self, event: DirectoryTree.DirectorySelected
     ) -> None:
@@ -143,14 +188,48 @@ class MainScreen(Screen):
                 self._navigate_to(path)
                 if self.learn_mode:
                     cmd = build_find(self.current_path, "")
-                    self.query_one("#command-log", CommandLog).log_command(cmd)
+                    self._command_log.log_command(cmd)
 
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         self.app.push_screen(
             SearchScreen(self.current_path, show_hidden=table.show_hidden),
             callback=on_result,
         )
 
+    def action_filter(self) -> None:
+        filter_input = self.query_one("#filter-input", Input)
+        filter_input.add_class("visible")
+        filter_input.focus()
+        self._table.prepare_filter()
+
+    def action_clear_filter(self) -> None:
+        if self.query_one("#filter-input", Input).has_class("visible"):
+            self._close_filter()
+            self._table.focus()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "filter-input":
+            self._table.set_filter(event.value)
+            self._update_status()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "filter-input":
+            return
+        table = self._table
+        if not event.value:
+            self._close_filter()
+        elif self.learn_mode:
+            cmd = build_ls_grep(self.current_path, event.value, show_hidden=table.show_hidden)
+            self._command_log.log_command(cmd)
+        table.focus()
+
+    def _close_filter(self) -> None:
+        filter_input = self.query_one("#filter-input", Input)
+        filter_input.remove_class("visible")
+        if filter_input.value:
+            filter_input.value = ""
+            self._table.set_filter("")
+
     def action_toggle_learn(self) -> None:
         self.learn_mode = not self.learn_mode
         self._update_learn_mode_ui()
@@ -158,7 +237,7 @@ class MainScreen(Screen):
         self.notify(f"Learn mode: {state}")
 
     def _update_learn_mode_ui(self) -> None:
-        log = self.query_one("#command-log", CommandLog)
+        log = self._command_log
         if self.learn_mode:
             log.add_class("visible")
         else:
@@ -166,7 +245,7 @@ class MainScreen(Screen):
         self._update_status()
 
     def action_toggle_hidden(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         tree = self.query_one("#directory-tree", FilteredDirectoryTree)
         table.toggle_hidden()
         tree.toggle_hidden()
@@ -174,6 +253,27 @@ class MainScreen(Screen):
         self.notify(f"Hidden files: {state}")
         self._update_status()
 
+    def action_cycle_sort(self) -> None:
+        table = self._table
+        modes = list(SortMode)
+        mode = modes[(modes.index(table.sort_mode) + 1) % len(modes)]
+        self._apply_sort(mode, table.sort_reverse)
+
+    def action_reverse_sort(self) -> None:
+        table = self._table
+        self._apply_sort(table.sort_mode, not table.sort_reverse)
+
+    def _apply_sort(self, mode: SortMode, reverse: bool) -> None:
+        table = self._table
+        table.set_sort(mode, reverse)
+        order = "reversed" if reverse else "normal"
+        self.notify(f"Sort: {mode.value} ({order})")
+        if self.learn_mode:
+            cmd = build_ls(
+                self.current_path, show_hidden=table.show_hidden, sort_flags=table.sort_flags
+            )
+            self._command_log.log_command(cmd)
+
     def action_go_up(self) -> None:
         parent = self.current_path.parent
         if parent != self.current_path:
@@ -182,6 +282,22 @@ class MainScreen(Screen):
     def action_go_home(self) -> None:
         self._navigate_to(Path.home())
 
+    def action_go_back(self) -> None:
+        table = self._table
+        if not self._history.can_go_back:
+            return
+        entry = self._history.back(table.history_entry())
+        if entry is not None:
+            self._navigate_to(entry.path, entry)
+
+    def action_go_forward(self) -> None:
+        table = self._table
+        if not self._history.can_go_forward:
+            return
+        entry = self._history.forward(table.history_entry())
+        if entry is not None:
+            self._navigate_to(entry.path, entry)
+
     def action_new_file(self) -> None:
         def on_result(name: str | None) -> None:
             if name:
@@ -190,10 +306,10 @@ class MainScreen(Screen):
                 if result.success:
                     self.notify(f"Created: {name}")
                     if self.learn_mode:
-                        self.query_one("#command-log", CommandLog).log_command(
+                        self._command_log.log_command(
                             result.shell_command
                         )
-                    self._refresh_table()
+                    self._refresh_table(path, select=path)
                 else:
                     self.notify(f"Error: {result.error}", severity="error")
 
@@ -209,10 +325,10 @@ class MainScreen(Screen):
                 if result.success:
                     self.notify(f"Created folder: {name}")
                     if self.learn_mode:
-                        self.query_one("#command-log", CommandLog).log_command(
+                        self._command_log.log_command(
                             result.shell_command
                         )
-                    self._refresh_table()
+                    self._refresh_table(path, select=path)
                 else:
                     self.notify(f"Error: {result.error}", severity="error")
 
@@ -221,7 +337,7 @@ class MainScreen(Screen):
         )
 
     def action_rename(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -234,10 +350,10 @@ class MainScreen(Screen):
                 if result.success:
                     self.notify(f"Renamed to: {new_name}")
                     if self.learn_mode:
-                        self.query_one("#command-log", CommandLog).log_command(
+                        self._command_log.log_command(
                             result.shell_command
                         )
-                    self._refresh_table()
+                    self._refresh_table(selected.path, new_path, select=new_path)
                 else:
                     self.notify(f"Error: {result.error}", severity="error")
 
@@ -247,7 +363,7 @@ class MainScreen(Screen):
         )
 
     def action_delete(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -259,10 +375,10 @@ class MainScreen(Screen):
                 if result.success:
                     self.notify(f"Moved to Trash: {selected.name}")
                     if self.learn_mode:
-                        self.query_one("#command-log", CommandLog).log_command(
+                        self._command_log.log_command(
                             result.shell_command
                         )
-                    self._refresh_table()
+                    self._refresh_table(selected.path)
                 else:
                     self.notify(f"Error: {result.error}", severity="error")
 
@@ -275,7 +391,7 @@ class MainScreen(Screen):
         )
 
     def action_copy(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -285,7 +401,7 @@ class MainScreen(Screen):
         self.notify(f"Copied: {selected.name}")
 
     def action_cut(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -313,17 +429,17 @@ class MainScreen(Screen):
             action = "Moved" if self._clipboard_cut else "Copied"
             self.notify(f"{action}: {self._clipboard.name}")
             if self.learn_mode:
-                self.query_one("#command-log", CommandLog).log_command(
+                self._command_log.log_command(
                     result.shell_command
                 )
+            self._refresh_table(self._clipboard, dst, select=dst)
             if self._clipboard_cut:
                 self._clipboard = None
-            self._refresh_table()
         else:
             self.notify(f"Error: {result.error}", severity="error")
 
     def action_open_file(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -332,14 +448,14 @@ class MainScreen(Screen):
         if result.success:
             self.notify(f"Opening: {selected.name}")
             if self.learn_mode:
-                self.query_one("#command-log", CommandLog).log_command(
+                self._command_log.log_command(
                     result.shell_command
                 )
         else:
             self.notify(f"Error: {result.error}", severity="error")
 
     def action_disk_usage(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
         if not selected:
             self.notify("No file selected", severity="warning")
@@ -348,25 +464,73 @@ class MainScreen(Screen):
         self.notify(f"Disk usage of '{selected.name}': {usage}")
         if self.learn_mode:
             cmd = build_du(selected.path)
-            self.query_one("#command-log", CommandLog).log_command(cmd)
+            self._command_log.log_command(cmd)
 
     def action_teach_mode(self) -> None:
         from shellguide.screens.teach_screen import TeachScreen
 
         self.app.push_screen(TeachScreen())
 
+    # ── Live updates ────────────────────────────────────────────
+
+    def _update_watches(self) -> None:
+        """Watch the listed directory plus every expanded tree node."""
+        if self._watcher is None:
+            return
+        tree = self.query_one("#directory-tree", FilteredDirectoryTree)
+        self._watcher.set_paths([self.current_path, *tree.expanded_paths()])
+
+    def _on_filesystem_changes(self, changes: Changes) -> None:
+        """Called on the watcher thread with a coalesced batch of changes."""
+        try:
+            self.app.call_from_thread(self._apply_filesystem_changes, changes)
+        except RuntimeError:
+            # The app is shutting down.
+            pass
+
+    def _apply_filesystem_changes(self, changes: Changes) -> None:
+        if self.current_path in changes and not self.current_path.is_dir():
+            # The directory we're showing went away; fall back to the
+            # nearest ancestor that still exists.
+            parent = next(p for p in self.current_path.parents if p.is_dir())
+            self._navigate_to(parent)
+            return
+
+        table = self._table
+        tree = self.query_one("#directory-tree", FilteredDirectoryTree)
+        name_index.invalidate(changes)
+        for directory, names in changes.items():
+            listing_cache.discard(directory)
+            if directory == self.current_path:
+                if names is None:
+                    table.rescan()
+                else:
+                    table.update_entries(directory / name for name in names)
+            tree.refresh_directory(directory)
+        self._update_status()
+
     # ── Helpers ─────────────────────────────────────────────────
 
-    def _refresh_table(self) -> None:
-        table = self.query_one("#file-table", FileTable)
-        table.refresh_file_list()
+    def _refresh_table(self, *changed: Path, select: Path | None = None) -> None:
+        """Bring the file table up to date after an operation.
+
+        When the operation knows which paths it touched only those rows are
+        re-stat'ed; otherwise the directory is rescanned and diffed.
+        """
+        table = self._table
+        if changed:
+            table.update_entries(changed, select=select)
+        else:
+            table.rescan()
         self._update_status()
 
     def _update_status(self) -> None:
-        table = self.query_one("#file-table", FileTable)
+        table = self._table
         selected = table.selected_file
-        self.query_one("#status-bar", StatusBar).update_status(
+        self._status_bar.update_status(
             item_count=table.file_count,
+            total_count=table.total_count,
             selected_name=selected.name if selected else "",
             learn_mode=self.learn_mode,
+            loading=table.is_loading,
         )
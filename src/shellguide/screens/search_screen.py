@@ -2,18 +2,37 @@
 
 from __future__ import annotations
 
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
 
+from textual import work
 from textual.app import ComposeResult
+from textual.binding import Binding
 from textual.containers import Vertical
 from textual.screen import ModalScreen
+from textual.timer import Timer
 from textual.widgets import DataTable, Input, Static
+from textual.worker import get_current_worker
 
-from shellguide.core.file_utils import FileInfo, search_files
+from shellguide.core.file_utils import FileInfo
+from shellguide.core.fuzzy import FuzzySession, Ranked
+from shellguide.core.name_index import name_index
+from shellguide.core.search import SearchSession
+
+# How long typing has to pause before a search starts (seconds).
+_SEARCH_DELAY = 0.15
+
+# Results shown per query.
+_MAX_RESULTS = 50
 
 
 class SearchScreen(ModalScreen[Path | None]):
-    """Modal screen for searching files."""
+    """Modal screen for searching files, by name or fuzzily by path."""
+
+    BINDINGS = [
+        Binding("ctrl+t", "toggle_fuzzy", "Fuzzy", show=False),
+    ]
 
     DEFAULT_CSS = """
     SearchScreen {
@@ -30,43 +49,139 @@ class SearchScreen(ModalScreen[Path | None]):
         height: 1fr;
         margin-top: 1;
     }
+    #search-status {
+        color: $text-muted;
+    }
     """
 
     def __init__(self, search_root: Path, show_hidden: bool = False) -> None:
         super().__init__()
         self._search_root = search_root
-        self._show_hidden = show_hidden
+        # Keeps each walk's matches so typing more filters them in memory.
+        self._session = SearchSession(search_root, show_hidden, index=name_index)
+        self._fuzzy_session = FuzzySession(search_root, show_hidden, index=name_index)
+        self._fuzzy = False
         self._results: list[FileInfo] = []
+        # Bumped on every keystroke so results of an older query are dropped.
+        self._generation = 0
+        self._search_timer: Timer | None = None
 
     def compose(self) -> ComposeResult:
         with Vertical(id="search-container"):
-            yield Static("[bold]Search Files[/]  (Escape to close)")
+            yield Static(self._title(), id="search-title")
             yield Input(placeholder="Type to search...", id="search-input")
             table = DataTable(id="search-results")
             table.cursor_type = "row"
             yield table
+            yield Static("", id="search-status")
 
     def on_mount(self) -> None:
+        # Built in the background on first use; walks answer until then.
+        name_index.start()
         table = self.query_one("#search-results", DataTable)
         table.add_columns("", "Name", "Path")
         self.query_one("#search-input", Input).focus()
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        query = event.value.strip()
-        table = self.query_one("#search-results", DataTable)
-        table.clear()
+        self._start_search(event.value.strip())
+
+    def action_toggle_fuzzy(self) -> None:
+        self._fuzzy = not self._fuzzy
+        if self._fuzzy:
+            self._fuzzy_session.load()
+        self.query_one("#search-title", Static).update(self._title())
+        self._start_search(self.query_one("#search-input", Input).value.strip())
+
+    def _title(self) -> str:
+        if self._fuzzy:
+            return "[bold]Search Paths[/] (fuzzy)  (Escape to close, Ctrl+T for names)"
+        return "[bold]Search Files[/]  (Escape to close, Ctrl+T for fuzzy paths)"
+
+    def _start_search(self, query: str) -> None:
+        self._generation += 1
+        self.query_one("#search-results", DataTable).clear()
         self._results = []
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
+        self.workers.cancel_group(self, "search")
 
         if len(query) < 2:
+            self._set_status("")
+            return
+
+        generation = self._generation
+        search = self._rank if self._fuzzy else self._search
+        session = self._fuzzy_session if self._fuzzy else self._session
+        if session.refines(query):
+            # Answered from memory: no walk to save by waiting.
+            search(query, generation)
+            return
+        self._search_timer = self.set_timer(_SEARCH_DELAY, lambda: search(query, generation))
+
+    @work(thread=True, exclusive=True, group="search", exit_on_error=False)
+    def _search(self, query: str, generation: int) -> None:
+        """Search the root, sending each hit to the table as it is found."""
+        worker = get_current_worker()
+        self.app.call_from_thread(self._set_status, "Searching…", generation)
+        results = self._session.search(query, cancelled=lambda: worker.is_cancelled)
+        with closing(results):
+            for path in islice(results, _MAX_RESULTS):
+                if worker.is_cancelled:
+                    return
+                self.app.call_from_thread(self._add_result, FileInfo(Path(path)), generation)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._finish_search, generation)
+
+    @work(thread=True, exclusive=True, group="search", exit_on_error=False)
+    def _rank(self, query: str, generation: int) -> None:
+        """Rank every path under the root, showing the best so far as it goes."""
+        worker = get_current_worker()
+        self.app.call_from_thread(self._set_status, "Ranking…", generation)
+
+        def show(ranked: Ranked) -> None:
+            infos = [FileInfo(Path(path)) for _, path in ranked]
+            if not worker.is_cancelled:
+                self.app.call_from_thread(self._show_results, infos, generation)
+
+        ranked = self._fuzzy_session.search(
+            query, _MAX_RESULTS, lambda: worker.is_cancelled, progress=show
+        )
+        if ranked is not None and not worker.is_cancelled:
+            show(ranked)
+            self.app.call_from_thread(self._finish_search, generation)
+
+    def _show_results(self, infos: list[FileInfo], generation: int) -> None:
+        if generation != self._generation:
             return
+        self.query_one("#search-results", DataTable).clear()
+        self._results = []
+        for info in infos:
+            self._add_result(info, generation)
 
-        self._results = search_files(
-            self._search_root, query, show_hidden=self._show_hidden, max_results=50
+    def _add_result(self, info: FileInfo, generation: int) -> None:
+        if generation != self._generation:
+            return
+        self._results.append(info)
+        icon = "\U0001f4c1" if info.is_dir else "\U0001f4c4"
+        rel = str(info.path.relative_to(self._search_root))
+        self.query_one("#search-results", DataTable).add_row(
+            icon, info.name, rel, key=str(info.path)
         )
-        for info in self._results:
-            icon = "\U0001f4c1" if info.is_dir else "\U0001f4c4"
-            rel = str(info.path.relative_to(self._search_root))
-            table.add_row(icon, info.name, rel, key=str(info.path))
+
+    def _finish_search(self, generation: int) -> None:
+        count = len(self._results)
+        if count >= _MAX_RESULTS:
+            best = "Best" if self._fuzzy else "First"
+            self._set_status(f"{best} {count} matches", generation)
+        elif count:
+            self._set_status(f"{count} match{'es' if count > 1 else ''}", generation)
+        else:
+            self._set_status("No matches", generation)
+
+    def _set_status(self, text: str, generation: int | None = None) -> None:
+        if generation is None or generation == self._generation:
+            self.query_one("#search-status", Static).update(text)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         idx = event.cursor_row
@@ -75,6 +190,10 @@ class SearchScreen(ModalScreen[Path | None]):
             # Navigate to the parent directory if it's a file, or the dir itself
             self.dismiss(result.path if result.is_dir else result.path.parent)
 
+    def on_unmount(self) -> None:
+        self._session.close()
+        self._fuzzy_session.close()
+
     def on_key(self, event) -> None:
         if event.key == "escape":
             self.dismiss(None)
@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
+from textual import work
 from textual.containers import Vertical
 from textual.widgets import Static
+from textual.worker import get_current_worker
 
 from shellguide.core.file_utils import FileInfo
+from shellguide.core.mounts import filesystem_type, is_slow
 
 
 class FileInfoPanel(Vertical):
-    """Shows detailed information about the currently selected file."""
+    """Shows detailed information about the currently selected file.
+
+    What the listing already knows is shown at once. Anything that needs
+    the disk is fetched on a worker and filled in when it arrives, unless
+    another file has been highlighted since.
+    """
 
     DEFAULT_CSS = """
     FileInfoPanel {
@@ -19,31 +29,60 @@ class FileInfoPanel(Vertical):
 
     def compose(self):
         yield Static("File Details", id="info-title", classes="info-label")
-        yield Static("", id="info-name")
-        yield Static("", id="info-type")
-        yield Static("", id="info-size")
-        yield Static("", id="info-modified")
-        yield Static("", id="info-permissions")
-        yield Static("", id="info-owner")
-        yield Static("", id="info-path")
+        # Kept so a highlight change doesn't have to query for each field.
+        self._fields = {
+            field: Static("", id=f"info-{field}")
+            for field in (
+                "name", "type", "size", "modified", "created",
+                "permissions", "owner", "filesystem", "path",
+            )
+        }
+        yield from self._fields.values()
+        self._info: FileInfo | None = None
 
     def update_info(self, info: FileInfo | None) -> None:
         if info is None:
-            for child in self.query(Static):
-                if child.id != "info-title":
-                    child.update("")
+            self._info = None
+            self.workers.cancel_group(self, "details")
+            for field in self._fields.values():
+                field.update("")
             return
 
-        self.query_one("#info-name", Static).update(f"[bold]Name:[/] {info.name}")
-        self.query_one("#info-type", Static).update(f"[bold]Type:[/] {info.file_type}")
-        self.query_one("#info-size", Static).update(f"[bold]Size:[/] {info.human_size}")
-        self.query_one("#info-modified", Static).update(f"[bold]Modified:[/] {info.human_modified}")
-        self.query_one("#info-permissions", Static).update(f"[bold]Perms:[/] {info.permissions}")
-        self.query_one("#info-owner", Static).update(f"[bold]Owner:[/] {info.owner}:{info.group}")
+        self._info = info
+        # Details fetched for this entry before, until the fresh ones arrive.
+        self._show(info.detailed(read=False))
+        self._load_details(info)
+
+    @work(thread=True, exclusive=True, group="details", exit_on_error=False)
+    def _load_details(self, info: FileInfo) -> None:
+        worker = get_current_worker()
+        detailed = info.detailed(dont_sync=is_slow(info.path))
+        if worker.is_cancelled:
+            return
+        file_type = detailed.detect_type()
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._show_details, info, detailed, file_type)
+
+    def _show_details(self, info: FileInfo, detailed: FileInfo, file_type: str) -> None:
+        if info is self._info:
+            self._show(detailed, file_type)
+
+    def _show(self, info: FileInfo, file_type: str | None = None) -> None:
+        fields = self._fields
+        fields["name"].update(f"[bold]Name:[/] {info.name}")
+        fields["type"].update(f"[bold]Type:[/] {file_type or info.file_type}")
+        fields["size"].update(f"[bold]Size:[/] {info.human_size}")
+        fields["modified"].update(f"[bold]Modified:[/] {info.human_modified}")
+        fields["created"].update(f"[bold]Created:[/] {info.human_created}")
+        fields["permissions"].update(f"[bold]Perms:[/] {info.permissions}")
+        fields["owner"].update(f"[bold]Owner:[/] {info.owner}:{info.group}")
+        filesystem = filesystem_type(info.path) or "unknown"
+        if info.mnt_id is not None:
+            filesystem += f" (mount {info.mnt_id})"
+        fields["filesystem"].update(f"[bold]Filesystem:[/] {filesystem}")
         # Shorten path relative to home
-        from pathlib import Path
         home = str(Path.home())
         path_str = str(info.path)
         if path_str.startswith(home):
             path_str = "~" + path_str[len(home):]
-        self.query_one("#info-path", Static).update(f"[bold]Path:[/] {path_str}")
+        fields["path"].update(f"[bold]Path:[/] {path_str}")
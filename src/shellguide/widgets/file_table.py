@@ -1,26 +1,126 @@
-"""Center panel — file list DataTable widget."""
+"""Center panel — virtualized file list widget."""
 
 from __future__ import annotations
 
+import time
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
+from rich.cells import set_cell_size
+from rich.segment import Segment
+from rich.style import Style
+from textual import events, work
+from textual.binding import Binding
+from textual.geometry import Size
 from textual.message import Message
 from textual.reactive import reactive
-from textual.widgets import DataTable
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.timer import Timer
+from textual.worker import get_current_worker
 
-from shellguide.core.file_utils import FileInfo, list_directory
+from shellguide.core.file_utils import FileInfo, human_size, human_time
+from shellguide.core.fs_cache import Signature, directory_signature, listing_cache
+from shellguide.core.history import Anchor, HistoryEntry
+from shellguide.core.listing import (
+    DirectoryListing,
+    SortMode,
+    StatResult,
+    diff_listings,
+    list_names,
+    scan_directory,
+    scan_directory_batches,
+    scan_directory_parallel,
+    stat_entries,
+    stat_names,
+)
+from shellguide.core.mounts import is_slow
 
+_ICON_WIDTH = 3
+_SIZE_WIDTH = 11
+_MODIFIED_WIDTH = 18
 
-class FileTable(DataTable):
-    """DataTable that displays files in the current directory."""
+# Rescans that find at most this many changed names copy their rows into
+# the live listing; anything bigger swaps in the freshly scanned snapshot.
+_PATCH_LIMIT = 256
+
+# How long the cursor has to rest on a directory before that directory is
+# listed ahead of time (seconds).
+_PREFETCH_DELAY = 0.2
+
+# How often the Modified column is checked for ages that have moved on to
+# a new label, e.g. from "a minute ago" to "2 minutes ago" (seconds).
+_CLOCK_INTERVAL = 1.0
+
+
+class FileTable(ScrollView, can_focus=True):
+    """Scrollable list of the files in the current directory.
+
+    Rows are drawn on demand through Textual's line API straight from the
+    DirectoryListing, so UI work is bounded by the number of visible rows
+    rather than the number of entries in the directory.
+    """
+
+    BINDINGS = [
+        Binding("enter", "select_cursor", "Select", show=False),
+        Binding("up", "cursor_up", "Cursor up", show=False),
+        Binding("down", "cursor_down", "Cursor down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "cursor_top", "Top", show=False),
+        Binding("end", "cursor_bottom", "Bottom", show=False),
+    ]
+
+    COMPONENT_CLASSES = {
+        "file-table--header",
+        "file-table--even-row",
+        "file-table--cursor",
+    }
+
+    DEFAULT_CSS = """
+    FileTable {
+        background: $surface;
+        overflow-x: hidden;
+    }
+    FileTable > .file-table--header {
+        text-style: bold;
+        background: $panel;
+    }
+    FileTable > .file-table--even-row {
+        background: $primary 10%;
+    }
+    FileTable > .file-table--cursor {
+        background: $secondary 50%;
+    }
+    FileTable:focus > .file-table--cursor {
+        background: $accent;
+        color: $text;
+    }
+    """
 
     current_path: reactive[Path] = reactive(Path.home, init=False)
     show_hidden: bool = False
-    _files: list[FileInfo] = []
+    sort_mode: SortMode = SortMode.NAME
+    sort_reverse: bool = False
+    filter_text: str = ""
+    cursor_row: int = 0
+    is_loading: bool = False
+    _listing: DirectoryListing | None = None
+    _signature: Signature | None = None
+    _restore: Anchor | None = None
+    _generation: int = 0
     _mounted: bool = False
+    _prefetch_target: Path | None = None
+    _prefetch_timer: Timer | None = None
+    _highlight_pending: bool = False
+    # Changes were reported while a load was under way; rescan once it ends.
+    _stale: bool = False
 
     class FileSelected(Message):
-        """Posted when a file row is highlighted."""
+        """Posted when a file row is highlighted.
+
+        Sent at most once per screen refresh, for the row highlighted then.
+        """
         def __init__(self, file_info: FileInfo) -> None:
             super().__init__()
             self.file_info = file_info
@@ -31,11 +131,21 @@ class FileTable(DataTable):
             super().__init__()
             self.file_info = file_info
 
+    class ListingUpdated(Message):
+        """Posted when a batch of a directory listing has been shown."""
+        def __init__(self, count: int, complete: bool) -> None:
+            super().__init__()
+            self.count = count
+            self.complete = complete
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Modified text last drawn on each screen line, for _refresh_times.
+        self._drawn_times: dict[int, str] = {}
+
     def on_mount(self) -> None:
-        self.cursor_type = "row"
-        self.zebra_stripes = True
-        self.add_columns("", "Name", "Size", "Modified")
         self._mounted = True
+        self.set_interval(_CLOCK_INTERVAL, self._refresh_times)
         self.refresh_file_list()
 
     def watch_current_path(self) -> None:
@@ -43,39 +153,618 @@ class FileTable(DataTable):
             self.refresh_file_list()
 
     def refresh_file_list(self) -> None:
-        """Reload the file listing for current_path."""
-        self.clear()
-        self._files = list_directory(self.current_path, show_hidden=self.show_hidden)
-        for info in self._files:
-            icon = "\U0001f4c1" if info.is_dir else "\U0001f4c4"
-            name = info.name + ("/" if info.is_dir else "")
-            self.add_row(icon, name, info.human_size, info.human_modified, key=str(info.path))
-
-        if self._files:
-            self.move_cursor(row=0)
-            self.post_message(self.FileSelected(self._files[0]))
-
-    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
-        idx = event.cursor_row
-        if 0 <= idx < len(self._files):
-            self.post_message(self.FileSelected(self._files[idx]))
-
-    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
-        idx = event.cursor_row
-        if 0 <= idx < len(self._files):
-            self.post_message(self.FileActivated(self._files[idx]))
+        """Reload the file listing for current_path in the background.
+
+        The first screenful is shown as soon as it has been read and the
+        rest streams in; starting another load cancels this one.
+        """
+        self._restore = None
+        self._reset()
+        self._load_listing(self.current_path, self._generation)
+
+    def restore(self, entry: HistoryEntry) -> None:
+        """Show a directory from history again, back on the file it was left at.
+
+        A snapshot that is still current is shown straight away; otherwise
+        the directory is loaded as usual and the cursor jumps to the file
+        as soon as it turns up.
+        """
+        self.set_reactive(FileTable.current_path, entry.path)
+        self._restore = entry.anchor
+        self._reset()
+        listing = entry.snapshot()
+        if listing is None:
+            self._load_listing(entry.path, self._generation)
+        else:
+            self._show_listing(listing, self._generation, True, entry.signature)
+
+    def history_entry(self) -> HistoryEntry:
+        """Record what is shown now, to come back to with :meth:`restore`.
+
+        The live listing is handed over rather than copied, so this must
+        only be called just before the table moves to another directory.
+        """
+        complete = self._listing is not None and not self.is_loading
+        return HistoryEntry(
+            self.current_path,
+            self._anchor(),
+            self._listing if complete else None,
+            self._signature,
+        )
+
+    def _reset(self) -> None:
+        self._generation += 1
+        self._stale = False
+        self._listing = DirectoryListing(self.current_path)
+        self._signature = None
+        self.virtual_size = Size(0, 1)
+        self.cursor_row = 0
+        self.scroll_to(y=0, animate=False)
+        self.is_loading = True
+        self.refresh()
+
+    @work(thread=True, exclusive=True, group="listing")
+    def _load_listing(self, path: Path, generation: int) -> None:
+        worker = get_current_worker()
+        cached = listing_cache.lookup(path)
+        if cached is not None:
+            signature, listing = cached
+            self.app.call_from_thread(
+                self._show_listing, listing.copy(), generation, True, signature
+            )
+            return
+
+        started = time.perf_counter()
+        signature = directory_signature(path)
+        if is_slow(path, time.perf_counter() - started):
+            self._load_in_parallel(path, generation, signature)
+            return
+        batches = scan_directory_batches(path, cancelled=lambda: worker.is_cancelled)
+        for listing in batches:
+            if worker.is_cancelled:
+                return
+            self.app.call_from_thread(self._show_listing, listing, generation, False)
+        if not worker.is_cancelled:
+            listing_cache.put(listing.copy(), signature)
+            self.app.call_from_thread(
+                self._show_listing, listing, generation, True, signature
+            )
+
+    def _load_in_parallel(
+        self, path: Path, generation: int, signature: Signature | None
+    ) -> None:
+        """List a directory on a slow mount: names first, metadata as it arrives.
+
+        Runs in the _load_listing worker. The names are shown as soon as
+        the directory has been read, and the stat calls then go out in
+        parallel, each batch of results patched into the table.
+        """
+        worker = get_current_worker()
+        listing = list_names(path, cancelled=lambda: worker.is_cancelled)
+        if worker.is_cancelled:
+            return
+        self.app.call_from_thread(self._show_listing, listing.copy(), generation, False)
+        timed_out = False
+        for results in stat_entries(listing, cancelled=lambda: worker.is_cancelled):
+            listing.fill(results)
+            timed_out = timed_out or any(
+                isinstance(error, TimeoutError) for _, _, error in results
+            )
+            self.app.call_from_thread(self._fill_listing, results, generation)
+        if worker.is_cancelled:
+            return
+        if not timed_out:
+            listing_cache.put(listing.copy(), signature)
+        self.app.call_from_thread(self._fill_listing, [], generation, True, signature)
+
+    def _fill_listing(
+        self,
+        results: list[StatResult],
+        generation: int,
+        complete: bool = False,
+        signature: Signature | None = None,
+    ) -> None:
+        """Patch stat results from _load_in_parallel into the rows on display."""
+        if generation != self._generation:
+            return
+        listing = self._listing
+        anchor = self._anchor()
+        names = listing.fill(results)
+        if complete:
+            self.is_loading = False
+            self._signature = signature
+            self._catch_up()
+        self._restore_anchor(anchor, names, complete=complete)
+
+    def _show_listing(
+        self,
+        listing: DirectoryListing,
+        generation: int,
+        complete: bool,
+        signature: Signature | None = None,
+    ) -> None:
+        """Swap in a newer snapshot, keeping the cursor on the same file."""
+        if generation != self._generation:
+            return
+        listing.sort_by(self.sort_mode, self.sort_reverse)
+        listing.set_show_hidden(self.show_hidden)
+        listing.set_filter(self.filter_text)
+        self.is_loading = not complete
+        if complete:
+            self._signature = signature
+            self._catch_up()
+        previous = self._listing
+        if listing is previous:
+            self.post_message(self.ListingUpdated(len(listing), complete))
+            return
+
+        restore = self._restore
+        if restore is not None:
+            if self.cursor_row:
+                # The user moved on before the remembered file turned up.
+                self._restore = None
+            elif complete or listing.find(restore[0], restore[1]) is not None:
+                self._restore = None
+                self._listing = listing
+                self._restore_anchor(restore, [restore[0]], complete=complete)
+                return
+
+        # A cursor left at the top stays at the top; one the user has moved
+        # follows its file as later batches are sorted in around it.
+        row = 0
+        if previous is not None and self.cursor_row:
+            cursor = self.cursor_row
+            found = listing.find(previous.name(cursor), previous.is_dir(cursor))
+            row = found if found is not None else 0
+        top_changed = not row and (
+            previous is None
+            or not len(previous)
+            or not len(listing)
+            or previous.name(0) != listing.name(0)
+        )
+        self._listing = listing
+        self.virtual_size = Size(0, len(listing) + 1)
+        self.cursor_row = row
+        self.move_cursor(row)
+        self.refresh()
+
+        if top_changed and len(listing):
+            self._post_highlight()
+        self.post_message(self.ListingUpdated(len(listing), complete))
+
+    # ── Incremental refresh ─────────────────────────────────────
+
+    def update_entries(self, paths: Iterable[Path], select: Path | None = None) -> None:
+        """Re-stat just *paths* off the UI thread and patch their rows in place.
+
+        Paths outside current_path are ignored. The cursor stays on the
+        file it was on (or moves to *select*) and the viewport keeps its
+        position, so nothing jumps back to the top. While the listing is
+        still loading the changes are caught up on once it has finished.
+        """
+        listing = self._listing
+        if listing is None:
+            self.refresh_file_list()
+            return
+        if self.is_loading:
+            self._stale = True
+            return
+        names = [p.name for p in paths if p.parent == listing.path]
+        if names:
+            self._update_entries(
+                listing.path, names, select.name if select else None, self._generation
+            )
+
+    @work(thread=True, group="entries")
+    def _update_entries(
+        self, path: Path, names: list[str], select: str | None, generation: int
+    ) -> None:
+        fresh = stat_names(path, names)
+        self.app.call_from_thread(self._apply_entries, fresh, names, select, generation)
+
+    def _apply_entries(
+        self,
+        fresh: DirectoryListing,
+        names: list[str],
+        select: str | None,
+        generation: int,
+    ) -> None:
+        if generation != self._generation:
+            return
+        listing = self._listing
+        anchor = self._anchor()
+        if listing.adopt(fresh, names):
+            listing_cache.discard(listing.path)
+            self._restore_anchor(anchor, names, select)
+
+    def rescan(self) -> None:
+        """Re-read current_path off the UI thread and apply only the differences.
+
+        While the listing is still loading, that happens once it has finished.
+        """
+        if self._listing is None:
+            self.refresh_file_list()
+            return
+        if self.is_loading:
+            self._stale = True
+            return
+        self._rescan(self._listing.copy(), self._generation)
+
+    def _catch_up(self) -> None:
+        """Rescan for changes reported while loading, after the load is shown."""
+        if self._stale:
+            self._stale = False
+            # Queued, so the complete listing is in place when it runs.
+            self.call_later(self.rescan)
+
+    @work(thread=True, exclusive=True, group="listing")
+    def _rescan(self, old: DirectoryListing, generation: int) -> None:
+        signature = directory_signature(old.path)
+        new = self._scan(old.path)
+        listing_cache.put(new.copy(), signature)
+        changed = diff_listings(old, new)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(
+                self._apply_rescan, new, changed, generation, signature
+            )
+
+    def _apply_rescan(
+        self,
+        new: DirectoryListing,
+        changed: list[str],
+        generation: int,
+        signature: Signature | None,
+    ) -> None:
+        if generation != self._generation:
+            return
+        self._signature = signature
+        if not changed:
+            return
+        if len(changed) <= _PATCH_LIMIT:
+            # A handful of changes: copy their rows into the live listing.
+            # The cache already holds the new scan, so it stays.
+            anchor = self._anchor()
+            if self._listing.adopt(new, changed):
+                self._restore_anchor(anchor, changed)
+            return
+        anchor = self._anchor()
+        new.sort_by(self.sort_mode, self.sort_reverse)
+        new.set_show_hidden(self.show_hidden)
+        new.set_filter(self.filter_text)
+        self._listing = new
+        self._restore_anchor(anchor, changed)
+
+    def set_sort(self, mode: SortMode, reverse: bool = False) -> None:
+        """Re-order the loaded listing in place, keeping the cursor's file."""
+        self.sort_mode = mode
+        self.sort_reverse = reverse
+        listing = self._listing
+        if listing is None:
+            return
+        anchor = self._anchor()
+        listing.sort_by(mode, reverse)
+        self._restore_anchor(anchor, [], complete=not self.is_loading)
+
+    def set_filter(self, text: str) -> None:
+        """Show only files whose name contains *text*; "" shows them all.
+
+        The cursor stays on its file while that file still matches and
+        otherwise moves to the first match.
+        """
+        self.filter_text = text
+        listing = self._listing
+        if listing is None:
+            return
+        anchor = self._anchor()
+        listing.set_filter(text)
+        if anchor is not None and listing.find(anchor[0], anchor[1]) is None:
+            anchor = None
+        self._restore_anchor(anchor, [], complete=not self.is_loading)
+
+    def prepare_filter(self) -> None:
+        """Get the loaded listing ready for filtering before the first keystroke."""
+        if self._listing is not None and not self.is_loading:
+            self._listing.prepare_filter()
+
+    def _anchor(self) -> Anchor | None:
+        """Remember the highlighted file and where it sits in the viewport."""
+        listing = self._listing
+        row = self.cursor_row
+        if listing is None or not 0 <= row < len(listing):
+            return None
+        return (listing.name(row), listing.is_dir(row), row, row - int(self.scroll_y))
+
+    def _restore_anchor(
+        self,
+        anchor: Anchor | None,
+        changed: list[str],
+        select: str | None = None,
+        complete: bool = True,
+    ) -> None:
+        listing = self._listing
+        count = len(listing)
+        self.virtual_size = Size(0, count + 1)
+        row = None
+        if select is not None:
+            row = listing.find(select, True)
+            if row is None:
+                row = listing.find(select, False)
+        if row is None and anchor is not None:
+            name, is_dir, old_row, offset = anchor
+            row = listing.find(name, is_dir)
+            if row is None:
+                row = min(old_row, count - 1)
+        row = max(0, row or 0)
+        offset = anchor[3] if anchor is not None else 0
+        self.cursor_row = row
+        # Forced: right after a directory change the scrollbar hasn't been
+        # laid out yet and an unforced scroll would be ignored.
+        self.scroll_to(y=max(0, row - offset), animate=False, force=True)
+        self.move_cursor(row)
+        self.refresh()
+
+        if count and (
+            anchor is None or listing.name(row) != anchor[0] or anchor[0] in changed
+        ):
+            self._post_highlight()
+        self.post_message(self.ListingUpdated(count, complete))
+
+    # ── Prefetch ────────────────────────────────────────────────
+
+    def _schedule_prefetch(self) -> None:
+        """List the highlighted directory into the cache once the cursor settles.
+
+        Enter on a directory is the likely next key, so a short dwell on
+        one starts a background scan that makes opening it a cache hit.
+        Only one prefetch runs at a time, and moving to another row drops
+        both the pending timer and a scan already under way.
+        """
+        listing = self._listing
+        row = self.cursor_row
+        target = None
+        if listing is not None and row < len(listing) and listing.is_dir(row):
+            target = listing.path / listing.name(row)
+        if target == self._prefetch_target:
+            return
+        self._prefetch_target = target
+        if self._prefetch_timer is not None:
+            self._prefetch_timer.stop()
+            self._prefetch_timer = None
+        self.workers.cancel_group(self, "prefetch")
+        if target is not None:
+            self._prefetch_timer = self.set_timer(_PREFETCH_DELAY, self._start_prefetch)
+
+    def _start_prefetch(self) -> None:
+        self._prefetch_timer = None
+        target = self._prefetch_target
+        if target is None:
+            return
+        if self.is_loading:
+            # Don't compete with the listing being shown for the disk.
+            self._prefetch_timer = self.set_timer(_PREFETCH_DELAY, self._start_prefetch)
+            return
+        self._prefetch(target)
+
+    @work(thread=True, exclusive=True, group="prefetch", exit_on_error=False)
+    def _prefetch(self, path: Path) -> None:
+        worker = get_current_worker()
+        if listing_cache.get(path) is not None:
+            return
+        signature = directory_signature(path)
+        listing = self._scan(path, cancelled=lambda: worker.is_cancelled)
+        if not worker.is_cancelled:
+            listing_cache.put(listing, signature)
+
+    @staticmethod
+    def _scan(
+        path: Path, cancelled: Callable[[], bool] = lambda: False
+    ) -> DirectoryListing:
+        """Full listing of *path*, with parallel stat calls on slow mounts."""
+        if is_slow(path):
+            return scan_directory_parallel(path, cancelled)
+        return scan_directory(path, cancelled)
+
+    # ── Cursor ──────────────────────────────────────────────────
+
+    @property
+    def _page_rows(self) -> int:
+        return max(1, self.scrollable_content_region.height - 1)
+
+    def move_cursor(self, row: int) -> None:
+        """Move the cursor to *row*, scrolling it into view."""
+        count = self.file_count
+        if not count:
+            return
+        row = max(0, min(row, count - 1))
+        previous = self.cursor_row
+        self.cursor_row = row
+
+        top = int(self.scroll_y)
+        if row < top:
+            self.scroll_to(y=row, animate=False)
+        elif row >= top + self._page_rows:
+            self.scroll_to(y=row - self._page_rows + 1, animate=False)
+        self.refresh_line(previous + 1)
+        self.refresh_line(row + 1)
+        self._schedule_prefetch()
+
+        if row != previous:
+            self._post_highlight()
+
+    def _post_highlight(self) -> None:
+        """Announce the highlighted file once the screen next refreshes.
+
+        Holding an arrow key can move the cursor many times between two
+        frames; only the row it ends up on is worth describing, so moves
+        before the refresh share a single FileSelected.
+        """
+        if not self._highlight_pending:
+            self._highlight_pending = True
+            self.call_after_refresh(self._flush_highlight)
+
+    def _flush_highlight(self) -> None:
+        self._highlight_pending = False
+        selected = self.selected_file
+        if selected is not None:
+            self.post_message(self.FileSelected(selected))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor_row - self._page_rows)
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor_row + self._page_rows)
+
+    def action_cursor_top(self) -> None:
+        self.move_cursor(0)
+
+    def action_cursor_bottom(self) -> None:
+        self.move_cursor(self.file_count - 1)
+
+    def action_select_cursor(self) -> None:
+        info = self.selected_file
+        if info is not None:
+            self.post_message(self.FileActivated(info))
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None or offset.y == 0:
+            return
+        row = int(self.scroll_y) + offset.y - 1
+        if row >= self.file_count:
+            return
+        if row == self.cursor_row:
+            self.action_select_cursor()
+        else:
+            self.move_cursor(row)
+
+    def on_focus(self) -> None:
+        self.refresh()
+
+    def on_blur(self) -> None:
+        self.refresh()
+
+    # ── Rendering ───────────────────────────────────────────────
+
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        if y == 0:
+            return self._render_row(
+                "", *self._headers(), self.get_component_rich_style("file-table--header"),
+                width,
+            )
+
+        row = int(self.scroll_y) + y - 1
+        listing = self._listing
+        if listing is None or row >= len(listing):
+            if row == 0 and (self.is_loading or self.filter_text):
+                message = "Loading\u2026" if self.is_loading else "No matches"
+                return self._render_row(
+                    "", message, "", "", self.rich_style + Style(dim=True), width
+                )
+            return Strip.blank(width, self.rich_style)
+
+        is_dir = listing.is_dir(row)
+        if listing.is_pending(row):
+            size = modified = "\u2026"
+        else:
+            size = human_size(listing.size(row), is_dir)
+            modified = human_time(listing.mtime(row))
+        self._drawn_times[y] = modified
+        style = self.rich_style
+        if row == self.cursor_row:
+            style += self.get_component_rich_style("file-table--cursor")
+        elif row % 2:
+            style += self.get_component_rich_style("file-table--even-row")
+        return self._render_row(
+            "\U0001f4c1" if is_dir else "\U0001f4c4",
+            listing.name(row) + ("/" if is_dir else ""),
+            size,
+            modified,
+            style,
+            width,
+        )
+
+    def _refresh_times(self) -> None:
+        """Redraw the visible rows whose Modified text is out of date.
+
+        Only the mtimes already in the listing are compared against the
+        labels last drawn on each line, so nothing is re-read from disk
+        and rows whose label hasn't changed aren't repainted.
+        """
+        listing = self._listing
+        if listing is None:
+            return
+        now = time.time()
+        top = int(self.scroll_y)
+        count = len(listing)
+        for y, drawn in self._drawn_times.items():
+            row = top + y - 1
+            if row < count and human_time(listing.mtime(row), now) != drawn:
+                self.refresh_line(row + 1)
+
+    def _headers(self) -> tuple[str, str, str]:
+        """Column titles, with an arrow on the one the rows are sorted by."""
+        mode = self.sort_mode
+        descending = (mode in (SortMode.SIZE, SortMode.MTIME)) != self.sort_reverse
+        arrow = " \u25bc" if descending else " \u25b2"
+        if mode is SortMode.SIZE:
+            return ("Name", "Size" + arrow, "Modified")
+        if mode is SortMode.MTIME:
+            return ("Name", "Size", "Modified" + arrow)
+        if mode is SortMode.NAME:
+            return ("Name" + arrow, "Size", "Modified")
+        return (f"Name ({mode.value}){arrow}", "Size", "Modified")
+
+    @staticmethod
+    def _render_row(
+        icon: str, name: str, size: str, modified: str, style: Style, width: int
+    ) -> Strip:
+        name_width = max(1, width - _ICON_WIDTH - _SIZE_WIDTH - _MODIFIED_WIDTH - 1)
+        text = (
+            " "
+            + set_cell_size(icon, _ICON_WIDTH)
+            + set_cell_size(name, name_width)
+            + set_cell_size(size.rjust(_SIZE_WIDTH - 1), _SIZE_WIDTH)
+            + " "
+            + set_cell_size(modified, _MODIFIED_WIDTH - 1)
+        )
+        return Strip([Segment(set_cell_size(text, width), style)], width)
+
+    # ── Queries ─────────────────────────────────────────────────
 
     @property
     def selected_file(self) -> FileInfo | None:
         idx = self.cursor_row
-        if 0 <= idx < len(self._files):
-            return self._files[idx]
+        if 0 <= idx < self.file_count:
+            return self._listing.info(idx)
         return None
 
+    @property
+    def sort_flags(self) -> str:
+        """The ``ls`` options matching the current sort, e.g. "S" or "tr"."""
+        return self.sort_mode.ls_flag + ("r" if self.sort_reverse else "")
+
     @property
     def file_count(self) -> int:
-        return len(self._files)
+        return len(self._listing) if self._listing is not None else 0
+
+    @property
+    def total_count(self) -> int:
+        """Number of files in the directory, counting those filtered out."""
+        return self._listing.total if self._listing is not None else 0
 
     def toggle_hidden(self) -> None:
+        """Show or hide dotfiles in the loaded listing, without re-reading it."""
         self.show_hidden = not self.show_hidden
-        self.refresh_file_list()
+        listing = self._listing
+        if listing is None:
+            return
+        anchor = self._anchor()
+        listing.set_show_hidden(self.show_hidden)
+        self._restore_anchor(anchor, [], complete=not self.is_loading)
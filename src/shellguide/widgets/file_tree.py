@@ -2,24 +2,242 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
-from textual.widgets import DirectoryTree
+from textual import work
+from textual.message import Message
+from textual.widgets import DirectoryTree, Tree
+from textual.widgets.directory_tree import DirEntry
+from textual.widgets.tree import TreeNode, UnknownNodeID
+from textual.worker import Worker, get_current_worker
+
+from shellguide.core.fs_cache import listing_cache
+from shellguide.core.listing import list_directories
+
+# Children added to a node at a time. The rest wait behind a "more" entry
+# that adds the next page when selected.
+TREE_PAGE = 200
 
 
 class FilteredDirectoryTree(DirectoryTree):
-    """DirectoryTree subclass that can filter hidden files."""
+    """Directory-only tree that loads in the background and can hide dotfiles.
+
+    Nodes list subdirectories only; files are the file list's business.
+    Expanding a node reads it on a worker thread, so input is never
+    blocked, and collapsing it again before the read finishes cancels it.
+    Every loaded directory keeps its full list of subdirectories, dotted
+    ones included, so hiding or showing them only removes or adds nodes.
+    """
 
     show_hidden: bool = False
 
-    def filter_paths(self, paths: list[Path]) -> list[Path]:
-        if self.show_hidden:
-            return sorted(paths, key=lambda p: p.name.lower())
-        return sorted(
-            [p for p in paths if not p.name.startswith(".")],
-            key=lambda p: p.name.lower(),
-        )
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Per loaded node id: every subdirectory name, how many of them
+        # have been paged in, and the "more" entry while some haven't.
+        self._contents: dict[int, list[str]] = {}
+        self._consumed: dict[int, int] = {}
+        self._more: dict[int, TreeNode[DirEntry]] = {}
+        self._loading: dict[int, Worker] = {}
+
+    class ExpansionChanged(Message):
+        """Posted when a directory node is expanded or collapsed."""
+
+    @staticmethod
+    def _read_directory(path: Path, cancelled: Callable[[], bool]) -> list[str]:
+        """Subdirectory names of *path*, from the shared listing cache if it has them.
+
+        On a miss only directory entries are read: files aren't stat'ed,
+        however many there are.
+        """
+        listing = listing_cache.get(path)
+        if listing is not None:
+            return listing.directories()
+        return list_directories(path, cancelled)
+
+    @work(thread=True, exit_on_error=False)
+    def _load_directory(self, node: TreeNode[DirEntry]) -> list[str]:
+        """Used by DirectoryTree when it reloads a subtree."""
+        assert node.data is not None
+        worker = get_current_worker()
+        path = node.data.path.expanduser().resolve()
+        return self._read_directory(path, lambda: worker.is_cancelled)
+
+    @work(thread=True, exit_on_error=False, group="tree-expand")
+    def _expand(self, node: TreeNode[DirEntry]) -> None:
+        assert node.data is not None
+        worker = get_current_worker()
+        path = node.data.path.expanduser().resolve()
+        content = self._read_directory(path, lambda: worker.is_cancelled)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._finish_expand, node, content, worker)
+
+    def _finish_expand(
+        self, node: TreeNode[DirEntry], content: list[str], worker: Worker
+    ) -> None:
+        if self._loading.get(node.id) is not worker:
+            # Collapsed, or reloaded, while the worker ran.
+            return
+        del self._loading[node.id]
+        try:
+            self.get_node_by_id(node.id)
+        except UnknownNodeID:
+            # Its parent was reloaded in the meantime.
+            return
+        cursor = self.cursor_node
+        self._populate_node(node, content)
+        if cursor is not None:
+            self.move_cursor(cursor, animate=False)
+
+    def _populate_node(self, node: TreeNode[DirEntry], content: Iterable[str]) -> None:
+        worker = self._loading.pop(node.id, None)
+        if worker is not None:
+            # A reload got there first.
+            worker.cancel()
+        self._contents[node.id] = list(content)
+        self._consumed[node.id] = 0
+        self._more.pop(node.id, None)
+        node.remove_children()
+        self._add_page(node)
+        node.expand()
+
+    def _visible(self, name: str) -> bool:
+        return self.show_hidden or not name.startswith(".")
+
+    def _add_page(self, node: TreeNode[DirEntry]) -> TreeNode[DirEntry] | None:
+        """Add up to TREE_PAGE more of *node*'s subdirectories, before its "more" entry.
+
+        Returns the first node added, if any.
+        """
+        content = self._contents[node.id]
+        more = self._more.get(node.id)
+        end, added = self._consumed[node.id], []
+        while end < len(content) and len(added) < TREE_PAGE:
+            name = content[end]
+            end += 1
+            if self._visible(name):
+                added.append(node.add(name, data=DirEntry(node.data.path / name), before=more))
+        self._consumed[node.id] = end
+        self._update_more(node)
+        return added[0] if added else None
+
+    def _update_more(self, node: TreeNode[DirEntry]) -> None:
+        """Add, relabel or remove *node*'s "more" entry to match what is left."""
+        rest = self._contents[node.id][self._consumed[node.id]:]
+        remaining = sum(map(self._visible, rest))
+        more = self._more.get(node.id)
+        if not remaining:
+            if more is not None:
+                more.remove()
+                del self._more[node.id]
+        elif more is None:
+            self._more[node.id] = node.add_leaf(f"… {remaining:,} more")
+        else:
+            more.set_label(f"… {remaining:,} more")
 
     def toggle_hidden(self) -> None:
+        """Show or hide dotfiles from the children already loaded.
+
+        Nothing is read from disk, expanded directories stay expanded, and
+        the cursor stays on its node — or on the nearest directory still
+        shown if its node was hidden.
+        """
         self.show_hidden = not self.show_hidden
-        self.reload()
+        cursor = self.cursor_node
+        if not self.show_hidden and cursor is not None:
+            node = cursor
+            while node.parent is not None:
+                if node.data is not None and node.data.path.name.startswith("."):
+                    cursor = node.parent
+                node = node.parent
+
+        contents: dict[int, list[str]] = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            content = self._contents.get(node.id)
+            if content is None:
+                continue
+            contents[node.id] = content
+            if self.show_hidden:
+                self._add_hidden(node, content)
+            else:
+                for child in list(node.children):
+                    if child.data is not None and child.data.path.name.startswith("."):
+                        child.remove()
+            self._update_more(node)
+            stack.extend(node.children)
+        # Only nodes still in the tree were visited; drop the rest.
+        self._contents = contents
+        self._consumed = {node_id: self._consumed[node_id] for node_id in contents}
+        self._more = {
+            node_id: more for node_id, more in self._more.items() if node_id in contents
+        }
+        if cursor is not None:
+            # Node lines are recomputed on the next refresh.
+            self.call_after_refresh(self.move_cursor, cursor)
+
+    def _add_hidden(self, node: TreeNode[DirEntry], content: list[str]) -> None:
+        """Insert the dotted names among *node*'s children, within the pages shown."""
+        more = self._more.get(node.id)
+        shown = iter([child for child in node.children if child is not more])
+        following = next(shown, None)
+        for name in content[:self._consumed[node.id]]:
+            if not name.startswith("."):
+                following = next(shown, None)
+                continue
+            node.add(
+                name,
+                data=DirEntry(node.data.path / name),
+                before=following if following is not None else more,
+            )
+
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded[DirEntry]) -> None:
+        # Replaces DirectoryTree's loader, which reads one node at a time.
+        event.prevent_default()
+        node = event.node
+        if node.data is not None and not node.data.loaded:
+            node.data.loaded = True
+            node.remove_children()
+            node.add_leaf("Loading…")
+            self._loading[node.id] = self._expand(node)
+        self.post_message(self.ExpansionChanged())
+
+    def on_tree_node_collapsed(self, event: Tree.NodeCollapsed[DirEntry]) -> None:
+        node = event.node
+        worker = self._loading.pop(node.id, None)
+        if worker is not None:
+            worker.cancel()
+            node.data.loaded = False
+            node.remove_children()
+        self.post_message(self.ExpansionChanged())
+
+    def on_tree_node_selected(self, event: Tree.NodeSelected[DirEntry]) -> None:
+        node = event.node
+        if node.parent is not None and self._more.get(node.parent.id) is node:
+            event.prevent_default()
+            first = self._add_page(node.parent)
+            if first is not None:
+                self.call_after_refresh(self.move_cursor, first)
+
+    def _expanded_nodes(self) -> list[TreeNode[DirEntry]]:
+        nodes = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.is_expanded and node.data is not None:
+                nodes.append(node)
+                stack.extend(node.children)
+        return nodes
+
+    def expanded_paths(self) -> list[Path]:
+        """Directories whose children are currently shown in the tree."""
+        return [node.data.path for node in self._expanded_nodes()]
+
+    def refresh_directory(self, path: Path) -> None:
+        """Reload the children of *path* if its node is expanded."""
+        for node in self._expanded_nodes():
+            if node.data.path == path and node.data.loaded:
+                self.reload_node(node)
+                return
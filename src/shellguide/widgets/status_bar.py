@@ -9,27 +9,39 @@ class StatusBar(Static):
     """Status bar showing item count, selection, and learn mode state."""
 
     _item_count: int = 0
+    _total_count: int | None = None
     _selected_name: str = ""
     _learn_mode: bool = True
+    _loading: bool = False
 
     def update_status(
         self,
         item_count: int | None = None,
         selected_name: str | None = None,
         learn_mode: bool | None = None,
+        loading: bool | None = None,
+        total_count: int | None = None,
     ) -> None:
         if item_count is not None:
             self._item_count = item_count
+        self._total_count = total_count
         if selected_name is not None:
             self._selected_name = selected_name
         if learn_mode is not None:
             self._learn_mode = learn_mode
+        if loading is not None:
+            self._loading = loading
         self._render_status()
 
     def _render_status(self) -> None:
         learn = "[bold green]LEARN ON[/]" if self._learn_mode else "[dim]LEARN OFF[/]"
+        count = f"  {self._item_count} items"
+        if self._total_count is not None and self._total_count != self._item_count:
+            count = f"  {self._item_count} of {self._total_count} items"
+        if self._loading:
+            count += " [dim](loading\u2026)[/]"
         parts = [
-            f"  {self._item_count} items",
+            count,
             self._selected_name,
             learn,
         ]
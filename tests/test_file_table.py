@@ -0,0 +1,57 @@
+"""Tests for the file list widget."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from textual.app import App, ComposeResult
+
+from shellguide.widgets.file_table import FileTable
+
+# Enough entries that the listing streams in over several batches.
+ENTRIES = 30_000
+
+
+class TableApp(App):
+    def compose(self) -> ComposeResult:
+        yield FileTable()
+
+
+def _names(table: FileTable) -> set[str]:
+    listing = table._listing
+    return {listing.name(row) for row in range(len(listing))}
+
+
+def test_changes_during_a_load_are_applied_once_it_finishes(tmp_path: Path) -> None:
+    for i in range(ENTRIES):
+        (tmp_path / f"file{i:05}").touch()
+    busy = tmp_path / "busy.log"
+
+    async def run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            table = app.query_one(FileTable)
+            table.current_path = tmp_path
+            generation = table._generation
+            flushes = 0
+            # A watcher on a busy directory: a change every few milliseconds.
+            for _ in range(2000):
+                if not table.is_loading:
+                    break
+                busy.write_text(str(flushes))
+                table.update_entries([busy])
+                flushes += 1
+                await pilot.pause(0.005)
+            assert flushes
+            assert not table.is_loading
+            # The load ran to the end instead of starting over.
+            assert table._generation == generation
+            await pilot.pause(0.5)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            names = _names(table)
+            assert len(names) == ENTRIES + 1
+            assert busy.name in names
+
+    asyncio.run(run())
@@ -0,0 +1,34 @@
+"""Tests for file metadata."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from shellguide.core.listing import scan_directory
+
+
+def _info(path: Path):
+    listing = scan_directory(path.parent)
+    return listing.info(listing.find(path.name, False))
+
+
+def test_detailed_sees_a_chmod(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("hello")
+    path.chmod(0o644)
+    assert _info(path).detailed().permissions == "-rw-r--r--"
+
+    # chmod leaves mtime, and so the listing's row, alone.
+    path.chmod(0o600)
+    info = _info(path)
+    assert info.detailed().permissions == "-rw-------"
+    assert info.detailed(read=False).permissions == "-rw-------"
+
+
+def test_detailed_without_reading_uses_only_what_is_remembered(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("hello")
+    info = _info(path)
+    assert info.detailed(read=False) is info
+    info.detailed()
+    assert info.detailed(read=False) is not info
@@ -0,0 +1,90 @@
+"""Tests for directory snapshots."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from shellguide.core import uring
+from shellguide.core.listing import (
+    diff_listings,
+    scan_directory,
+    scan_directory_batched,
+    scan_directory_batches,
+    scan_directory_parallel,
+    stat_names,
+)
+
+
+def _last(iterator):
+    result = None
+    for result in iterator:
+        pass
+    return result
+
+
+SCANS = {
+    "serial": scan_directory,
+    "batches": lambda path: _last(scan_directory_batches(path)),
+    "parallel": scan_directory_parallel,
+    "batched": scan_directory_batched,
+}
+
+
+def _rows(listing):
+    return [
+        (info.name, info.is_dir, info.is_symlink, info.error is not None, info.file_type)
+        for info in listing
+    ]
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "file.txt").write_text("hello")
+    (tmp_path / "sub").mkdir()
+    os.symlink("file.txt", tmp_path / "good-link")
+    os.symlink("missing", tmp_path / "dangling")
+    return tmp_path
+
+
+@pytest.mark.parametrize("scan", SCANS.values(), ids=SCANS.keys())
+def test_dangling_symlink_is_a_symlink(tree: Path, scan) -> None:
+    (row,) = [row for row in _rows(scan(tree)) if row[0] == "dangling"]
+    assert row == ("dangling", False, True, True, "Symlink")
+
+
+def test_scans_agree(tree: Path) -> None:
+    expected = _rows(scan_directory(tree))
+    for name, scan in SCANS.items():
+        assert _rows(scan(tree)) == expected, name
+
+
+def test_batched_scan_without_io_uring(tree: Path, monkeypatch) -> None:
+    monkeypatch.setattr(uring, "available", lambda: False)
+    assert _rows(scan_directory_batched(tree)) == _rows(scan_directory(tree))
+
+
+def test_adopt_matches_a_fresh_scan(tree: Path) -> None:
+    live = scan_directory(tree)
+    (tree / "file.txt").write_text("longer contents")
+    (tree / "new.txt").write_text("new")
+    (tree / "sub").rmdir()
+    os.chmod(tree / "good-link", 0o600)
+
+    new = scan_directory(tree)
+    changed = diff_listings(live, new)
+    assert live.adopt(new, changed)
+    assert _rows(live) == _rows(scan_directory(tree))
+
+
+def test_adopt_from_stat_names(tree: Path) -> None:
+    (tree / "old.txt").write_text("old")
+    live = scan_directory(tree)
+    (tree / "new.txt").write_text("new")
+    (tree / "old.txt").unlink()
+
+    names = ["new.txt", "old.txt", "never-existed"]
+    assert live.adopt(stat_names(tree, names), names)
+    assert _rows(live) == _rows(scan_directory(tree))